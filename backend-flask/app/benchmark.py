@@ -0,0 +1,173 @@
+import json
+import statistics
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func
+from .db import db
+
+
+def _benchmark_cases():
+    """
+    (name, path) for each timed request, with parameters picked from the data: the busiest recent week,
+    the most common level among active students and the student with the most lessons.
+    """
+    from .models import Lesson, LessonStudent, Level, Student, StudentStatus
+
+    latest = db.session.scalar(db.select(func.max(Lesson.datetime)))
+    if latest is None:
+        raise RuntimeError("No lessons found; run `flask generate-data` first.")
+    week_start = (latest - timedelta(days=latest.weekday() + 7)).date()
+
+    active = db.session.scalar(db.select(StudentStatus.id).where(StudentStatus.name == "Active"))
+    level = db.session.execute(
+        db.select(Level.name)
+        .join(Student, Student.current_level_id == Level.id)
+        .where(Student.current_status_id == active)
+        .group_by(Level.id, Level.name)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+    student_id = db.session.execute(
+        db.select(LessonStudent.student_id)
+        .group_by(LessonStudent.student_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).scalar_one()
+
+    cases = [
+        ("lessons_week", f"/api/lessons?start={week_start.isoformat()}&range_length=7"),
+        ("lessons_student", f"/api/lessons?student_id={student_id}&cursor=&per_page=50"),
+        ("students_all", "/api/students"),
+        ("students_active", "/api/students?status=Active"),
+        ("students_page", "/api/students?cursor=&per_page=50"),
+        ("student_detail", f"/api/students/{student_id}"),
+        ("quizzes_student", f"/api/student-lesson-quizzes?student_id={student_id}"),
+        ("quizzes_page", "/api/student-lesson-quizzes?cursor=&per_page=100"),
+    ]
+    if level:
+        cases.insert(4, ("students_active_level", f"/api/students?status=Active&level={level}"))
+    return cases
+
+
+def _dataset_size():
+    from .models import Lesson, LessonStudent, Student, StudentLessonQuiz
+
+    return {
+        model.__tablename__: db.session.scalar(db.select(func.count()).select_from(model))
+        for model in (Student, Lesson, LessonStudent, StudentLessonQuiz)
+    }
+
+
+def run_benchmarks(app, iterations=20, warmup=3):
+    """
+    Time the main read endpoints through the test client against the configured database.
+
+    Each case is requested `warmup` times untimed, then `iterations` times. Reports latency
+    (min, median, p95, mean in ms), SQL statements per request and response size. Requests are
+    authenticated as the first user in the database and never send conditional or compression headers.
+    Call inside an app context.
+    """
+    from .models import User
+
+    user = User.query.order_by(User.id).first()
+    if user is None:
+        raise RuntimeError("No users found; create one (e.g. `flask init-dev`) before benchmarking.")
+
+    client = app.test_client()
+    client.set_cookie(
+        app.config.get('JWT_ACCESS_COOKIE_NAME', 'access_token_cookie'),
+        create_access_token(identity=user.id, expires_delta=timedelta(hours=1)),
+        path=app.config.get('JWT_ACCESS_COOKIE_PATH', '/')
+    )
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    cases = _benchmark_cases()
+    results = {}
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    try:
+        for name, path in cases:
+            for _ in range(warmup):
+                client.get(path)
+
+            timings = []
+            for _ in range(iterations):
+                statements.clear()
+                start = perf_counter()
+                response = client.get(path)
+                body = response.get_data()
+                timings.append((perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {response.status_code}: {body[:200]!r}")
+
+            timings.sort()
+            results[name] = {
+                "path": path,
+                "min_ms": round(timings[0], 2),
+                "median_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                "mean_ms": round(statistics.fmean(timings), 2),
+                "queries": len(statements),
+                "bytes": len(body),
+            }
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "database": db.engine.dialect.name,
+        "dataset": _dataset_size(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def compare_benchmarks(current, baseline, threshold=20.0):
+    """
+    Compare median latencies with a previous run.
+    Returns (lines, regressions): one report line per case and the names of the cases whose median
+    grew by more than `threshold` percent.
+    """
+    lines = []
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            lines.append(f"{name:24} {result['median_ms']:9.2f}ms  (new)")
+            continue
+        change = (result["median_ms"] - previous["median_ms"]) / previous["median_ms"] * 100 if previous["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(
+            f"{name:24} {previous['median_ms']:9.2f}ms -> {result['median_ms']:9.2f}ms ({change:+.1f}%)"
+            f"  queries {previous['queries']} -> {result['queries']}{flag}"
+        )
+    return lines, regressions
+
+
+def format_results(report):
+    lines = [f"{report['database']} dataset: " + ", ".join(f"{table} {count}" for table, count in report['dataset'].items())]
+    for name, result in report["results"].items():
+        lines.append(
+            f"{name:24} median {result['median_ms']:9.2f}ms  p95 {result['p95_ms']:9.2f}ms  "
+            f"{result['queries']:3} queries  {result['bytes']} bytes"
+        )
+    return lines
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
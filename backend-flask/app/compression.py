@@ -0,0 +1,95 @@
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip only without it
+    brotli = None
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        # wbits 31: zlib stream with a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _make_encoder(encoding):
+    if encoding == 'br':
+        return _BrotliEncoder(current_app.config['COMPRESS_BROTLI_QUALITY'])
+    return _GzipEncoder(current_app.config['COMPRESS_GZIP_LEVEL'])
+
+
+def _stream(chunks, encoder):
+    # Flush after every chunk so streamed rows reach the client as they are produced
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def compress_response(response):
+    """
+    Compress eligible responses with brotli (when installed) or gzip, as accepted by the client.
+
+    COMPRESS_MIMETYPES maps each content type to compress to its minimum body size in bytes
+    (None uses COMPRESS_MIN_SIZE). Streamed responses are compressed chunk by chunk regardless of size.
+    Register before other after_request hooks so it runs last.
+    """
+    config = current_app.config
+    if not config['COMPRESS_ENABLED'] or response.mimetype not in config['COMPRESS_MIMETYPES']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or request.method == 'HEAD'
+    ):
+        return response
+
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.response, _make_encoder(encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        min_size = config['COMPRESS_MIMETYPES'][response.mimetype]
+        if len(data) < (config['COMPRESS_MIN_SIZE'] if min_size is None else min_size):
+            return response
+        encoder = _make_encoder(encoding)
+        response.set_data(encoder.compress(data) + encoder.finish())
+
+    response.headers['Content-Encoding'] = encoding
+    return response
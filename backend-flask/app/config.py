@@ -0,0 +1,138 @@
+import os
+
+# Fallbacks for local development only; set the environment variables in production
+DEV_SECRET_KEY = 'super-secret'
+DEV_SECURITY_PASSWORD_SALT = 'super-secret-salt'
+DEV_JWT_SECRET_KEY = 'another-super-secret'
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def normalize_database_uri(uri):
+    # Accept the common postgres:// form and use the psycopg 3 driver for PostgreSQL
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    if uri.startswith('postgresql://'):
+        uri = 'postgresql+psycopg://' + uri[len('postgresql://'):]
+    return uri
+
+
+class Config:
+    """
+    Base configuration. Secrets, pool and SQLITE_* settings are read from environment variables of the
+    same name and the database URI from DATABASE_URL; unset or empty variables keep the defaults.
+    """
+    SQLALCHEMY_DATABASE_URI = normalize_database_uri(os.environ.get('DATABASE_URL') or 'sqlite:///lesson_organizer.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    SECRET_KEY = os.environ.get('SECRET_KEY') or DEV_SECRET_KEY
+    SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT') or DEV_SECURITY_PASSWORD_SALT
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or DEV_JWT_SECRET_KEY
+
+    JWT_VERIFY_SUB = False
+    JWT_TOKEN_LOCATION = ['cookies']
+    JWT_ACCESS_COOKIE_PATH = '/api/'
+    JWT_COOKIE_SECURE = env_bool('JWT_COOKIE_SECURE', False)
+
+    # JSON responses (see app.json_provider); compact output is the default outside debug mode
+    JSON_SORT_KEYS = env_bool('JSON_SORT_KEYS', True)
+    JSON_COMPACT = env_bool('JSON_COMPACT', None)
+
+    # Response compression (see app.compression): content type -> minimum size in bytes, None for the default
+    COMPRESS_ENABLED = env_bool('COMPRESS_ENABLED', True)
+    COMPRESS_MIN_SIZE = env_int('COMPRESS_MIN_SIZE', 1024)
+    COMPRESS_MIMETYPES = {
+        'application/json': None,
+        'application/x-ndjson': None,
+        'text/csv': None,
+        'text/plain': None,
+        'text/html': None,
+    }
+    COMPRESS_GZIP_LEVEL = env_int('COMPRESS_GZIP_LEVEL', 6)
+    COMPRESS_BROTLI_QUALITY = env_int('COMPRESS_BROTLI_QUALITY', 4)
+
+    # Opt-in per-request profiling (see app.profiling): Server-Timing header and a log line per request
+    PROFILE_REQUESTS = env_bool('PROFILE_REQUESTS', False)
+    PROFILE_SLOW_REQUEST_MS = env_int('PROFILE_SLOW_REQUEST_MS', 500)
+    PROFILE_SLOW_QUERY_MS = env_int('PROFILE_SLOW_QUERY_MS', 100)
+    PROFILE_TOP_QUERIES = env_int('PROFILE_TOP_QUERIES', 3)
+
+    # Prometheus metrics at GET /metrics (see app.metrics); off by default since the endpoint is outside /api.
+    # When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', False)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+    # Connection pool for server databases (PostgreSQL); SQLite keeps SQLAlchemy's defaults
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    # Seconds startup keeps retrying the database connection before giving up
+    DB_READY_TIMEOUT = env_int('DB_READY_TIMEOUT', 30)
+
+    def __init__(self):
+        if not self.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+            self.SQLALCHEMY_ENGINE_OPTIONS = {
+                'pool_size': self.DB_POOL_SIZE,
+                'max_overflow': self.DB_MAX_OVERFLOW,
+                'pool_timeout': self.DB_POOL_TIMEOUT,
+                'pool_recycle': self.DB_POOL_RECYCLE,
+                # Drop connections the server closed (restarts, idle timeouts) instead of failing a request
+                'pool_pre_ping': True,
+            }
+
+        # SQLite pragma settings (see app.db.SQLITE_PRAGMA_DEFAULTS), only when set in the environment
+        for name in ('SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS'):
+            if os.environ.get(name):
+                setattr(self, name, os.environ[name])
+        for name in ('SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE'):
+            if os.environ.get(name):
+                setattr(self, name, int(os.environ[name]))
+        if os.environ.get('SQLITE_FOREIGN_KEYS'):
+            self.SQLITE_FOREIGN_KEYS = env_bool('SQLITE_FOREIGN_KEYS')
+
+
+class DevelopmentConfig(Config):
+    pass
+
+
+class ProductionConfig(Config):
+    # Larger default pool for the multi-worker production server
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 10)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 20)
+    # Key order carries no meaning for the frontend, skip sorting large payloads
+    JSON_SORT_KEYS = env_bool('JSON_SORT_KEYS', False)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    # In-memory SQLite unless a test database (e.g. a local PostgreSQL container) is given
+    SQLALCHEMY_DATABASE_URI = normalize_database_uri(os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:')
+
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    """
+    Return the configuration object for a profile: development, production or testing.
+    Defaults to APP_ENV, then FLASK_ENV (set by the compose files), then development.
+    """
+    name = name or os.environ.get('APP_ENV') or os.environ.get('FLASK_ENV') or 'development'
+    if name not in CONFIGS:
+        raise ValueError(f"Unknown configuration profile '{name}', expected one of {sorted(CONFIGS)}")
+    return CONFIGS[name]()
@@ -0,0 +1,64 @@
+from app.db import db
+from app.models.student_model import Student
+from app.models.student_status_history_model import StudentStatusHistory
+from app.models.student_level_history_model import StudentLevelHistory
+from app.models.lesson_model import Lesson
+from app.models.lesson_student_model import LessonStudent
+from sqlalchemy import func, or_, select, update
+
+def backfill_current_status_and_level():
+    """
+    Recompute every student's denormalized current status and level from their history records.
+    Runs as two set-based UPDATEs of the students whose values changed; students without history get NULLs.
+    """
+    latest_status = select(StudentStatusHistory).where(
+        StudentStatusHistory.student_id == Student.id
+    ).order_by(
+        StudentStatusHistory.changed_at.desc(), StudentStatusHistory.id.desc()
+    ).limit(1)
+
+    latest_level = select(StudentLevelHistory).where(
+        StudentLevelHistory.student_id == Student.id
+    ).order_by(
+        StudentLevelHistory.start_date.desc(), StudentLevelHistory.id.desc()
+    ).limit(1)
+
+    # Only students whose values change are updated, so their updated_date (and the API's ETag) moves with them
+    status_id = latest_status.with_only_columns(StudentStatusHistory.status_id).scalar_subquery()
+    status_changed_at = latest_status.with_only_columns(StudentStatusHistory.changed_at).scalar_subquery()
+    db.session.execute(
+        update(Student).where(or_(
+            Student.current_status_id.is_distinct_from(status_id),
+            Student.current_status_changed_at.is_distinct_from(status_changed_at)
+        )).values(
+            current_status_id=status_id,
+            current_status_changed_at=status_changed_at
+        ).execution_options(synchronize_session=False)
+    )
+    level_id = latest_level.with_only_columns(StudentLevelHistory.level_id).scalar_subquery()
+    level_start_date = latest_level.with_only_columns(StudentLevelHistory.start_date).scalar_subquery()
+    db.session.execute(
+        update(Student).where(or_(
+            Student.current_level_id.is_distinct_from(level_id),
+            Student.current_level_start_date.is_distinct_from(level_start_date)
+        )).values(
+            current_level_id=level_id,
+            current_level_start_date=level_start_date
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+def reconcile_lesson_student_count():
+    """
+    Recompute every lesson's denormalized student_count from its lesson_student links.
+    Runs as one set-based UPDATE of the lessons that drifted, which also moves their updated_date;
+    returns how many were corrected.
+    """
+    linked = select(func.count(LessonStudent.id)).where(LessonStudent.lesson_id == Lesson.id).scalar_subquery()
+    corrected = db.session.execute(
+        update(Lesson).where(Lesson.student_count != linked).values(
+            student_count=linked
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return corrected
@@ -25,4 +25,6 @@ def assign_students_to_lessons():
         if student not in lesson.students:
             lesson.students.append(student)
 
+    for lesson in lessons:
+        lesson.student_count = len(lesson.students)
     db.session.commit()
\ No newline at end of file
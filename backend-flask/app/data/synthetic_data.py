@@ -0,0 +1,222 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.db import db
+from app.models.student_model import Student
+from app.models.lesson_model import Lesson
+from app.models.lesson_student_model import LessonStudent
+from app.models.student_status_model import StudentStatus
+from app.models.student_status_history_model import StudentStatusHistory
+from app.models.student_level_history_model import StudentLevelHistory
+from app.models.level_model import Level
+from app.models.unit_model import Unit
+from app.models.quiz_model import Quiz
+from app.models.student_lesson_quiz_model import StudentLessonQuiz
+from app.data.initialize_data import (
+    create_all_student_status, create_all_curriculums, create_all_levels, create_all_units, create_all_quizzes
+)
+from app.data.backfill_data import backfill_current_status_and_level
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Camila", "Daniel", "Elisa", "Felipe", "Gabriela", "Hugo", "Isabela", "João",
+    "Karina", "Lucas", "Mariana", "Nicolas", "Olivia", "Pedro", "Rafaela", "Samuel", "Tatiana", "Vitor",
+]
+LAST_NAMES = [
+    "Almeida", "Barbosa", "Carvalho", "Dias", "Ferreira", "Gomes", "Lima", "Martins", "Nunes", "Oliveira",
+    "Pereira", "Ribeiro", "Santos", "Silva", "Souza", "Teixeira",
+]
+
+# Group size -> share of groups; most students take private lessons, a few join larger classes
+GROUP_SIZES = {1: 50, 2: 20, 3: 15, 4: 10, 6: 4, 8: 1}
+LESSON_HOURS = range(8, 21)
+LEVEL_MONTHS = (4, 8)        # months spent on a level before moving up
+QUIZ_EVERY_WEEKS = 4
+
+
+def _insert(model, rows, batch_size, returning=False):
+    """Insert rows in batches; with returning, the new ids come back in row order."""
+    ids = []
+    for offset in range(0, len(rows), batch_size):
+        batch = rows[offset:offset + batch_size]
+        if returning:
+            statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+            ids.extend(db.session.scalars(statement, batch).all())
+        else:
+            db.session.execute(insert(model), batch)
+    db.session.commit()
+    return ids
+
+
+def _student_rows(count, start, end, rng):
+    span = (end - start).days
+    return [
+        {
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "date_started": start + timedelta(days=rng.randrange(span)),
+            "classes_per_week": rng.choice((1, 1, 2, 2, 2, 3)),
+        }
+        for _ in range(count)
+    ]
+
+
+def _make_groups(students, rng):
+    """Split students (sorted by start date) into groups that meet at a fixed weekly slot."""
+    sizes, weights = zip(*GROUP_SIZES.items())
+    groups = []
+    position = 0
+    while position < len(students):
+        size = rng.choices(sizes, weights)[0]
+        members = students[position:position + size]
+        position += size
+        groups.append({
+            "members": [student["id"] for student in members],
+            "start": max(student["date_started"] for student in members),
+            "classes_per_week": max(student["classes_per_week"] for student in members),
+            "days": rng.sample(range(6), 3),
+            "hour": rng.choice(LESSON_HOURS),
+        })
+    return groups
+
+
+def _level_history(student, levels, end, rng):
+    """Consecutive levels from a random entry point, each held for a few months."""
+    rows = []
+    index = rng.randrange(len(levels))
+    when = student["date_started"]
+    while index < len(levels) and when <= end:
+        rows.append({"student_id": student["id"], "level_id": levels[index].id, "start_date": when})
+        index += 1
+        when += timedelta(days=30 * rng.randint(*LEVEL_MONTHS))
+    return rows
+
+
+def _status_history(student, statuses, end, rng):
+    """Trial, then Active; some students later go on hold, return or leave."""
+    student_id = student["id"]
+    when = student["date_started"]
+    rows = [{"student_id": student_id, "status_id": statuses["Trial"], "changed_at": when}]
+    when += timedelta(days=rng.randint(7, 21))
+    if when <= end:
+        rows.append({"student_id": student_id, "status_id": statuses["Active"], "changed_at": when})
+    for status in ("Hold", "Active", "Inactive"):
+        when += timedelta(days=rng.randint(60, 400))
+        if when > end or rng.random() < 0.5:
+            break
+        rows.append({"student_id": student_id, "status_id": statuses[status], "changed_at": when})
+    return rows
+
+
+def generate_synthetic_data(students=500, years=2, seed=0, batch_size=5000):
+    """
+    Populate the database with a synthetic school for benchmarking.
+
+    Creates `students` students who started over the last `years` years, grouped into private and group
+    classes that meet weekly from the day their last member started, with level and status histories
+    and a quiz result for every member every few weeks. Reference data (statuses, levels, units, quizzes)
+    is created if missing. Rows are added to any existing data; use a dedicated database.
+    The same seed always produces the same data. Returns the number of rows created per table.
+    """
+    rng = random.Random(seed)
+
+    create_all_student_status()
+    create_all_curriculums()
+    create_all_levels()
+    create_all_units()
+    create_all_quizzes()
+
+    statuses = {status.name: status.id for status in StudentStatus.query.all()}
+    levels = Level.query.order_by(Level.curriculum_id, Level.id).all()
+    quizzes_by_level = {}
+    for quiz_id, level_id in db.session.execute(
+        db.select(Quiz.id, Unit.level_id).join(Unit, Quiz.unit_id == Unit.id).order_by(Unit.level_id, Quiz.id)
+    ):
+        quizzes_by_level.setdefault(level_id, []).append(quiz_id)
+
+    end = datetime.now().replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=365 * years)
+
+    student_rows = _student_rows(students, start, end, rng)
+    student_ids = _insert(Student, student_rows, batch_size, returning=True)
+    for row, student_id in zip(student_rows, student_ids):
+        row["id"] = student_id
+    student_rows.sort(key=lambda row: row["date_started"])
+
+    level_rows = []
+    status_rows = []
+    for student in student_rows:
+        level_rows.extend(_level_history(student, levels, end, rng))
+        status_rows.extend(_status_history(student, statuses, end, rng))
+    _insert(StudentLevelHistory, level_rows, batch_size)
+    _insert(StudentStatusHistory, status_rows, batch_size)
+
+    # Each student's level over time, to pick quizzes that match it
+    levels_by_student = {}
+    for row in level_rows:
+        levels_by_student.setdefault(row["student_id"], []).append((row["start_date"], row["level_id"]))
+
+    def level_at(student_id, when):
+        current = None
+        for start_date, level_id in levels_by_student.get(student_id, ()):
+            if start_date > when:
+                break
+            current = level_id
+        return current
+
+    lesson_rows = []
+    lesson_members = []
+    for group in _make_groups(student_rows, rng):
+        week = group["start"] - timedelta(days=group["start"].weekday())
+        while week <= end:
+            for day in group["days"][:group["classes_per_week"]]:
+                when = week.replace(hour=group["hour"]) + timedelta(days=day)
+                if group["start"] <= when <= end:
+                    lesson_rows.append({
+                        "datetime": when, "plan": "Synthetic lesson", "student_count": len(group["members"])
+                    })
+                    lesson_members.append(group["members"])
+            week += timedelta(weeks=1)
+    lesson_ids = _insert(Lesson, lesson_rows, batch_size, returning=True)
+
+    link_rows = []
+    quiz_rows = []
+    last_quiz = {}
+    quiz_progress = {}
+    for lesson_id, lesson, members in zip(lesson_ids, lesson_rows, lesson_members):
+        when = lesson["datetime"]
+        for student_id in members:
+            link_rows.append({"lesson_id": lesson_id, "student_id": student_id})
+            if when - last_quiz.get(student_id, datetime.min) < timedelta(weeks=QUIZ_EVERY_WEEKS):
+                continue
+            level_id = level_at(student_id, when)
+            level_quizzes = quizzes_by_level.get(level_id)
+            if not level_quizzes:
+                continue
+            # Students work through their level's quizzes in order
+            last_quiz[student_id] = when
+            taken = quiz_progress.get((student_id, level_id), 0)
+            quiz_progress[(student_id, level_id)] = taken + 1
+            quiz_rows.append({
+                "student_id": student_id,
+                "lesson_id": lesson_id,
+                "quiz_id": level_quizzes[taken % len(level_quizzes)],
+                "points": None,
+            })
+    _insert(LessonStudent, link_rows, batch_size)
+
+    max_points = dict(db.session.execute(db.select(Quiz.id, Quiz.max_points)).all())
+    for row in quiz_rows:
+        maximum = max_points[row["quiz_id"]]
+        row["points"] = min(maximum, max(0, round(rng.gauss(0.8, 0.12) * maximum)))
+    _insert(StudentLessonQuiz, quiz_rows, batch_size)
+
+    backfill_current_status_and_level()
+
+    return {
+        "students": len(student_rows),
+        "student_level_history": len(level_rows),
+        "student_status_history": len(status_rows),
+        "lessons": len(lesson_rows),
+        "lesson_students": len(link_rows),
+        "student_lesson_quizzes": len(quiz_rows),
+    }
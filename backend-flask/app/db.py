@@ -1,3 +1,70 @@
 from flask_sqlalchemy import SQLAlchemy
+import time
+from sqlalchemy import event, text
+from sqlalchemy.exc import InterfaceError, OperationalError
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+# Connection settings applied to every new SQLite connection; override any of them in app.config
+SQLITE_PRAGMA_DEFAULTS = {
+    'SQLITE_JOURNAL_MODE': 'WAL',        # readers no longer block on a writer (and vice versa)
+    'SQLITE_SYNCHRONOUS': 'NORMAL',      # safe with WAL, fsyncs only at checkpoints
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,      # wait for a lock instead of failing with "database is locked"
+    'SQLITE_FOREIGN_KEYS': True,         # enforce FOREIGN KEY ... ON DELETE CASCADE / SET NULL
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+    'SQLITE_CACHE_SIZE': -64 * 1024,     # negative means KiB, i.e. 64 MiB of page cache per connection
+}
+
+def init_sqlite_pragmas(app):
+    """
+    Register a connect hook that applies the SQLITE_* settings to each new connection.
+    Does nothing when the configured database is not SQLite. Call after db.init_app(app).
+    """
+    for key, value in SQLITE_PRAGMA_DEFAULTS.items():
+        app.config.setdefault(key, value)
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA foreign_keys={'ON' if app.config['SQLITE_FOREIGN_KEYS'] else 'OFF'}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(app.config['SQLITE_CACHE_SIZE'])}",
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def wait_for_database(app, timeout=None, initial_delay=0.1, max_delay=2.0):
+    """
+    Block until the database accepts connections, retrying with exponential backoff.
+    Returns the seconds spent waiting. Gives up after timeout seconds (DB_READY_TIMEOUT by default)
+    and re-raises the last connection error.
+    """
+    if timeout is None:
+        timeout = app.config.get('DB_READY_TIMEOUT', 30)
+
+    start = time.monotonic()
+    delay = initial_delay
+    with app.app_context():
+        while True:
+            try:
+                with db.engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+                return time.monotonic() - start
+            except (OperationalError, InterfaceError):
+                elapsed = time.monotonic() - start
+                if elapsed + delay > timeout:
+                    raise
+                app.logger.info(f"Database not ready, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
@@ -0,0 +1,76 @@
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from .profiling import serialization_timer
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the stdlib json module
+    orjson = None
+
+
+def _default(o):
+    # Dates are ISO 8601 with either encoder (Flask's stdlib provider would emit HTTP dates)
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider used by jsonify() and request.get_json().
+
+    Serializes with orjson when it is installed, writing its bytes straight into the response, and falls
+    back to the stdlib json module otherwise. Configured through app.config:
+
+    - JSON_COMPACT: no whitespace when True, indented when False, indented only in debug mode when None.
+    - JSON_SORT_KEYS: sort object keys; turning it off saves work on large payloads.
+    """
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.compact = app.config.get('JSON_COMPACT')
+        self.sort_keys = app.config.get('JSON_SORT_KEYS', True)
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _orjson_options(self, indent=False):
+        # Non-string keys (e.g. integer ids) are converted like the stdlib encoder does
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        with serialization_timer():
+            return self._response(*args, **kwargs)
+
+    def _response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if orjson is None:
+            if self._indent():
+                body = self.dumps(obj, indent=2)
+            else:
+                body = self.dumps(obj, separators=(',', ':'))
+            return self._app.response_class(f"{body}\n", mimetype=self.mimetype)
+
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._orjson_options(indent=self._indent()) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,100 +1,209 @@
+from importlib import import_module
+from time import perf_counter
+import click
 from flask import Flask
-from flask_cors import CORS
-from flask_migrate import Migrate, upgrade
-from flask_security import Security, SQLAlchemyUserDatastore
-from flask_jwt_extended import JWTManager
-from datetime import timedelta
-from .db import db
-from .routes.lesson_routes import lesson_bp
-from .routes.student_routes import student_bp
-from .routes.curriculum_routes import curriculum_bp
-from .routes.level_routes import level_bp
-from .routes.unit_routes import unit_bp
-from .routes.student_level_history_routes import student_level_history_bp
-from .routes.lesson_student_routes import lesson_student_bp
-from .routes.quiz_routes import quiz_bp
-from .routes.student_lesson_quiz_routes import student_lesson_quiz_bp
-from .routes.student_status_routes import student_status_bp
-from .routes.student_status_history_routes import student_status_history_bp
-from .routes.user_routes import user_bp
-from .models import ALL_MODELS, User
-from .routes.authentication import auth_bp, refresh_expiring_jwts
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///lesson_organizer.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'super-secret'
-app.config['SECURITY_PASSWORD_SALT'] = 'super-secret-salt'
-app.config['JWT_SECRET_KEY'] = 'another-super-secret'
-
-# Initialize JWT
-app.config['JWT_VERIFY_SUB'] = False
-app.config['JWT_TOKEN_LOCATION'] = ['cookies']
-app.config['JWT_ACCESS_COOKIE_PATH'] = '/api/'
-app.config["JWT_COOKIE_SECURE"] = False # Set True in production
-
-# Initialize Flask-Migrate
-migrate = Migrate(app, db)
-
-db.init_app(app)
-
-# Setup Flask-Security
-user_datastore = SQLAlchemyUserDatastore(db, User, None)
-security = Security(app, user_datastore)
-
-
-jwt = JWTManager(app)
-
-# Configure CORS
-CORS(app, resources={r"/api/*": {"origins": "*", "supports_credentials": True}})
-
-app.register_blueprint(lesson_bp, url_prefix='/api')
-app.register_blueprint(student_bp, url_prefix='/api')
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(curriculum_bp, url_prefix='/api')
-app.register_blueprint(level_bp, url_prefix='/api')
-app.register_blueprint(unit_bp, url_prefix='/api')
-app.register_blueprint(student_level_history_bp, url_prefix='/api')
-app.register_blueprint(lesson_student_bp, url_prefix='/api')
-app.register_blueprint(quiz_bp, url_prefix='/api')
-app.register_blueprint(student_lesson_quiz_bp, url_prefix='/api')
-app.register_blueprint(student_status_bp, url_prefix='/api')
-app.register_blueprint(student_status_history_bp, url_prefix='/api')
-app.register_blueprint(user_bp, url_prefix='/api')
-
-app.after_request(refresh_expiring_jwts)
-
-# Flask CLI command for development initialization
-@app.cli.command()
-def init_dev():
-    """Initialize database for development"""
-    import time
-    
-    # Wait for database to be ready
-    time.sleep(5)
-    
-    try:
-        upgrade()
-        print("Database migrations applied successfully")
-    except Exception as e:
-        print(f"Migration failed: {e}")
-    
-    try:
-        db.create_all()
-        print("Database tables verified/created successfully")
-    except Exception as e:
-        print(f"Table creation failed: {e}")
-    
-    try:
-        from .data.initialize_data import create_all_data
-        create_all_data()
-        print("Data initialization completed successfully")
-    except Exception as e:
-        print(f"Data initialization failed: {e}")
-
-@app.route('/')
-def hello_world():
-    return 'Hello, World!'
+from .db import db, init_sqlite_pragmas
+
+# (module, blueprint attribute), imported when an app is created rather than when this module is imported
+BLUEPRINTS = [
+    ('.routes.lesson_routes', 'lesson_bp'),
+    ('.routes.student_routes', 'student_bp'),
+    ('.routes.authentication', 'auth_bp'),
+    ('.routes.curriculum_routes', 'curriculum_bp'),
+    ('.routes.level_routes', 'level_bp'),
+    ('.routes.unit_routes', 'unit_bp'),
+    ('.routes.student_level_history_routes', 'student_level_history_bp'),
+    ('.routes.lesson_student_routes', 'lesson_student_bp'),
+    ('.routes.quiz_routes', 'quiz_bp'),
+    ('.routes.student_lesson_quiz_routes', 'student_lesson_quiz_bp'),
+    ('.routes.student_status_routes', 'student_status_bp'),
+    ('.routes.student_status_history_routes', 'student_status_history_bp'),
+    ('.routes.user_routes', 'user_bp'),
+]
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase took, stored on app.extensions['startup_timer'].
+    """
+    def __init__(self):
+        self.phases = []
+        self._last = self._start = perf_counter()
+
+    def mark(self, phase):
+        now = perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def summary(self):
+        phases = ', '.join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases)
+        return f"Startup took {(self._last - self._start) * 1000:.0f}ms ({phases})"
+
+
+def create_app(config=None):
+    """
+    Create and configure the Flask application.
+
+    config may be a profile name ('development', 'production', 'testing'), a config class or object;
+    defaults to the profile selected by APP_ENV/FLASK_ENV (see app.config.get_config).
+    """
+    from .config import DEV_SECRET_KEY, ProductionConfig, get_config
+    from .json_provider import FastJSONProvider
+    timer = StartupTimer()
+
+    if config is None or isinstance(config, str):
+        config = get_config(config)
+    elif isinstance(config, type):
+        config = config()
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    # Set the class too: Flask-Security re-creates app.json from a subclass of it
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.extensions['startup_timer'] = timer
+
+    if isinstance(config, ProductionConfig) and app.config['SECRET_KEY'] == DEV_SECRET_KEY:
+        app.logger.warning("Using the development SECRET_KEY; set SECRET_KEY, SECURITY_PASSWORD_SALT and JWT_SECRET_KEY")
+
+    # Record per-request SQL in debug mode (exposed through the X-Query-Count header)
+    app.config.setdefault('SQLALCHEMY_RECORD_QUERIES', app.debug)
+    timer.mark('config')
+
+    from flask_cors import CORS
+    from flask_jwt_extended import JWTManager
+    from flask_migrate import Migrate
+    from flask_security import Security, SQLAlchemyUserDatastore
+    from .models import User
+    timer.mark('imports')
+
+    Migrate(app, db)
+    db.init_app(app)
+    init_sqlite_pragmas(app)
+    if app.config.get('METRICS_ENABLED'):
+        # Registered before other request hooks so its timing and in-flight count cover them
+        from .metrics import init_metrics
+        init_metrics(app)
+
+    Security(app, SQLAlchemyUserDatastore(db, User, None))
+    JWTManager(app)
+    CORS(app, resources={r"/api/*": {"origins": "*", "supports_credentials": True}})
+    timer.mark('extensions')
+
+    for module_name, blueprint in BLUEPRINTS:
+        app.register_blueprint(getattr(import_module(module_name, __package__), blueprint), url_prefix='/api')
+
+    from .routes.authentication import refresh_expiring_jwts
+    from .routes.utils import add_conditional_headers, add_query_count_header
+    from .compression import compress_response
+    # after_request hooks run in reverse order; compression must see the final body and headers
+    app.after_request(compress_response)
+    if app.config.get('PROFILE_REQUESTS'):
+        # Registered next so its total covers the other hooks
+        from .profiling import init_profiling
+        init_profiling(app)
+    app.after_request(refresh_expiring_jwts)
+    app.after_request(add_query_count_header)
+    app.after_request(add_conditional_headers)
+    timer.mark('blueprints')
+
+    from .schemas.base_schema import warm_schema_cache
+    warm_schema_cache()
+    timer.mark('schemas')
+
+    register_commands(app)
+
+    @app.route('/')
+    def hello_world():
+        return 'Hello, World!'
+
+    app.logger.info(timer.summary())
+    return app
+
+
+def register_commands(app):
+    # Flask CLI command for development initialization
+    @app.cli.command()
+    def init_dev():
+        """Initialize database for development"""
+        from flask_migrate import upgrade
+        from .db import wait_for_database
+
+        try:
+            waited = wait_for_database(app)
+            print(f"Database ready after {waited:.1f}s")
+        except Exception as e:
+            print(f"Database not ready: {e}")
+
+        try:
+            upgrade()
+            print("Database migrations applied successfully")
+        except Exception as e:
+            print(f"Migration failed: {e}")
+
+        try:
+            db.create_all()
+            print("Database tables verified/created successfully")
+        except Exception as e:
+            print(f"Table creation failed: {e}")
+
+        try:
+            from .data.initialize_data import create_all_data
+            create_all_data()
+            print("Data initialization completed successfully")
+        except Exception as e:
+            print(f"Data initialization failed: {e}")
+
+    @app.cli.command()
+    def backfill_current_status():
+        """Recompute every student's current status and level from their history"""
+        from .data.backfill_data import backfill_current_status_and_level
+
+        backfill_current_status_and_level()
+        print("Student current status and level backfilled successfully")
+
+    @app.cli.command()
+    def reconcile_student_counts():
+        """Recompute every lesson's student_count from its lesson-student links"""
+        from .data.backfill_data import reconcile_lesson_student_count
+
+        corrected = reconcile_lesson_student_count()
+        print(f"Lesson student counts reconciled ({corrected} corrected)")
+
+    @app.cli.command()
+    @click.option('--students', default=500, show_default=True, help="Number of students to create.")
+    @click.option('--years', default=2, show_default=True, help="Years of lesson history.")
+    @click.option('--seed', default=0, show_default=True, help="Random seed; the same seed gives the same data.")
+    def generate_data(students, years, seed):
+        """Populate the database with a synthetic school for benchmarking"""
+        from .data.synthetic_data import generate_synthetic_data
+
+        start = perf_counter()
+        created = generate_synthetic_data(students=students, years=years, seed=seed)
+        print(", ".join(f"{table} {count}" for table, count in created.items()))
+        print(f"Synthetic data generated in {perf_counter() - start:.1f}s")
+
+    @app.cli.command()
+    @click.option('--iterations', default=20, show_default=True, help="Timed requests per endpoint.")
+    @click.option('--warmup', default=3, show_default=True, help="Untimed requests per endpoint.")
+    @click.option('--output', type=click.Path(dir_okay=False), help="Write the results to this JSON file.")
+    @click.option('--compare', type=click.Path(exists=True, dir_okay=False), help="Results file of a previous run.")
+    @click.option('--threshold', default=20.0, show_default=True, help="Median slowdown (%) reported as a regression.")
+    def benchmark(iterations, warmup, output, compare, threshold):
+        """Time the main endpoints against the configured database"""
+        from .benchmark import compare_benchmarks, format_results, load_results, run_benchmarks, save_results
+
+        report = run_benchmarks(app, iterations=iterations, warmup=warmup)
+        print("\n".join(format_results(report)))
+        if output:
+            save_results(report, output)
+            print(f"Results written to {output}")
+        if compare:
+            lines, regressions = compare_benchmarks(report, load_results(compare), threshold)
+            print("\n".join(lines))
+            if regressions:
+                raise click.ClickException(f"Regressions over {threshold:g}%: {', '.join(regressions)}")
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=4000)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=4000)
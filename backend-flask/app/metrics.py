@@ -0,0 +1,141 @@
+import hmac
+import os
+from time import perf_counter
+from flask import Response, abort, g, request
+from sqlalchemy import event
+from .db import db
+
+# Latency buckets in seconds; API requests are expected to take tens of milliseconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+# Metric objects live in the process-wide registry, so they are created once however many apps are built
+_metrics = None
+
+
+def _get_metrics():
+    global _metrics
+    if _metrics is None:
+        from prometheus_client import Counter, Gauge, Histogram
+        # Gauges are summed across live gunicorn workers in multiprocess mode (see gunicorn.conf.py)
+        _metrics = {
+            'request_latency': Histogram(
+                'http_request_duration_seconds', 'Request latency by route',
+                ['method', 'blueprint', 'route'], buckets=REQUEST_BUCKETS
+            ),
+            'requests': Counter(
+                'http_requests_total', 'Requests by route and status code',
+                ['method', 'blueprint', 'route', 'status']
+            ),
+            'in_flight': Gauge(
+                'http_requests_in_flight', 'Requests currently being served', multiprocess_mode='livesum'
+            ),
+            'query_latency': Histogram(
+                'db_query_duration_seconds', 'SQL statement execution time by statement type',
+                ['statement'], buckets=QUERY_BUCKETS
+            ),
+            'pool_checked_out': Gauge(
+                'db_pool_checked_out_connections', 'Database connections currently in use',
+                multiprocess_mode='livesum'
+            ),
+            'pool_size': Gauge(
+                'db_pool_size', 'Configured database pool size (0 when the pool is unbounded)',
+                multiprocess_mode='livesum'
+            ),
+            'jwt_refreshes': Counter(
+                'jwt_refreshes_total', 'Access tokens refreshed by refresh_expiring_jwts'
+            ),
+        }
+    return _metrics
+
+
+def record_jwt_refresh():
+    """Count an access token refreshed by authentication.refresh_expiring_jwts."""
+    if _metrics is not None:
+        _metrics['jwt_refreshes'].inc()
+
+
+def _statement_type(statement):
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return keyword if keyword in ('SELECT', 'INSERT', 'UPDATE', 'DELETE') else 'OTHER'
+
+
+def init_metrics(app):
+    """
+    Collect Prometheus metrics and serve them at GET /metrics (enabled with METRICS_ENABLED).
+    The endpoint is not behind JWT authentication; set METRICS_TOKEN to require it as a bearer token.
+
+    Records request latency and status codes per blueprint and route, in-flight requests, SQL statement
+    time by statement type, database pool usage and JWT refreshes. Under gunicorn the metrics of all
+    workers are aggregated through PROMETHEUS_MULTIPROC_DIR. Call after db.init_app(app).
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    # Imported only when enabled, so apps without metrics never load prometheus_client
+    try:
+        import prometheus_client
+        from prometheus_client.multiprocess import MultiProcessCollector
+    except ImportError:  # optional dependency, /metrics is not served without it
+        app.logger.warning("METRICS_ENABLED is set but prometheus_client is not installed; /metrics is disabled")
+        return
+
+    metrics = _get_metrics()
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        app.logger.warning("METRICS_TOKEN is not set; /metrics is served without authentication")
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        seconds = perf_counter() - conn.info['metrics_query_start'].pop()
+        metrics['query_latency'].labels(_statement_type(statement)).observe(seconds)
+
+    @event.listens_for(engine, 'checkout')
+    def pool_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics['pool_checked_out'].inc()
+
+    @event.listens_for(engine, 'checkin')
+    def pool_checkin(dbapi_connection, connection_record):
+        metrics['pool_checked_out'].dec()
+
+    size = getattr(engine.pool, 'size', None)
+    metrics['pool_size'].set(size() if callable(size) else 0)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = perf_counter()
+        metrics['in_flight'].inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get('metrics_start')
+        if start is None or request.endpoint == 'metrics':
+            return response
+        # The route pattern, not the path, keeps label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        blueprint = request.blueprint or ''
+        metrics['request_latency'].labels(request.method, blueprint, route).observe(perf_counter() - start)
+        metrics['requests'].labels(request.method, blueprint, route, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if g.pop('metrics_start', None) is not None:
+            metrics['in_flight'].dec()
+
+    @app.route('/metrics', endpoint='metrics')
+    def serve_metrics():
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = prometheus_client.CollectorRegistry()
+            MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
@@ -1,17 +1,35 @@
 from app.models.base_model import BaseModel
 from app.db import db
+from sqlalchemy import update
 
 class Lesson(BaseModel):
     __tablename__ = "lesson"
+    __table_args__ = (
+        db.Index("ix_lesson_datetime", "datetime"),
+        db.Index("ix_lesson_student_count_datetime", "student_count", "datetime"),
+    )
 
     datetime = db.Column(db.DateTime, nullable=False)
     plan = db.Column(db.String)
     concepts = db.Column(db.String)
     notes = db.Column(db.String)
 
+    # Denormalized number of lesson_student links, kept in sync by every route that changes them
+    # (see adjust_student_count); reconcile_lesson_student_count repairs any drift
+    student_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     students = db.relationship(
         "Student",
         secondary="lesson_student",
         back_populates="lessons"
-    )
\ No newline at end of file
+    )
+
+    @classmethod
+    def adjust_student_count(cls, lesson_ids, delta):
+        """Add delta to student_count of the given lessons in one UPDATE, safe against concurrent changes."""
+        lesson_ids = list(lesson_ids)
+        if lesson_ids:
+            db.session.execute(
+                update(cls).where(cls.id.in_(lesson_ids)).values(student_count=cls.student_count + delta)
+            )
@@ -3,6 +3,10 @@ from app.db import db
 
 class LessonStudent(BaseModel):
     __tablename__ = 'lesson_student'
-    
+    __table_args__ = (
+        db.Index('uq_lesson_student_lesson_id_student_id', 'lesson_id', 'student_id', unique=True),
+        db.Index('ix_lesson_student_student_id_lesson_id', 'student_id', 'lesson_id'),
+    )
+
     lesson_id = db.Column(db.Integer, db.ForeignKey('lesson.id', ondelete='CASCADE'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id', ondelete='CASCADE'), nullable=False)
\ No newline at end of file
@@ -3,6 +3,12 @@ from app.db import db
 
 class StudentLessonQuiz(BaseModel):
     __tablename__ = "student_lesson_quiz"
+    __table_args__ = (
+        db.Index("ix_student_lesson_quiz_student_id", "student_id"),
+        db.Index("ix_student_lesson_quiz_lesson_id", "lesson_id"),
+        db.Index("ix_student_lesson_quiz_quiz_id", "quiz_id"),
+        db.Index("ix_student_lesson_quiz_created_date_id", "created_date", "id"),
+    )
 
     student_id = db.Column(db.Integer, db.ForeignKey("student.id", ondelete="CASCADE"), nullable=False)
     lesson_id = db.Column(db.Integer, db.ForeignKey("lesson.id", ondelete="CASCADE"), nullable=False)
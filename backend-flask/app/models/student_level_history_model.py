@@ -3,7 +3,15 @@ from app.db import db
 
 class StudentLevelHistory(BaseModel):
     __tablename__ = "student_level_history"
+    __table_args__ = (
+        db.Index("ix_student_level_history_student_id_start_date", "student_id", "start_date"),
+        db.Index("ix_student_level_history_start_date_id", "start_date", "id"),
+        db.Index("ix_student_level_history_level_id", "level_id"),
+    )
 
     student_id = db.Column(db.Integer, db.ForeignKey("student.id", ondelete="CASCADE"), nullable=False)
     level_id = db.Column(db.Integer, db.ForeignKey("level.id", ondelete="CASCADE"), nullable=False)
-    start_date = db.Column(db.DateTime, nullable=False)
\ No newline at end of file
+    start_date = db.Column(db.DateTime, nullable=False)
+
+    # Relationships
+    level = db.relationship("Level", back_populates="student_level_history")
@@ -1,8 +1,14 @@
 from app.models.base_model import BaseModel
+from app.models.student_status_history_model import StudentStatusHistory
+from app.models.student_level_history_model import StudentLevelHistory
 from app.db import db
 
 class Student(BaseModel):
     __tablename__ = 'student'
+    __table_args__ = (
+        db.Index('ix_student_current_status_id', 'current_status_id'),
+        db.Index('ix_student_current_level_id', 'current_level_id'),
+    )
 
     first_name = db.Column(db.String, nullable=False)
     last_name = db.Column(db.String)
@@ -13,8 +19,30 @@ class Student(BaseModel):
     notes_weaknesses = db.Column(db.String)
     notes_future = db.Column(db.String)
 
+    # Denormalized from the latest status/level history records, kept in sync by refresh_current_status/level
+    current_status_id = db.Column(db.Integer, db.ForeignKey('student_status.id', ondelete='SET NULL'))
+    current_status_changed_at = db.Column(db.DateTime)
+    current_level_id = db.Column(db.Integer, db.ForeignKey('level.id', ondelete='SET NULL'))
+    current_level_start_date = db.Column(db.DateTime)
+
     # Relationships
     lessons = db.relationship('Lesson', secondary='lesson_student', back_populates='students')
     status_history = db.relationship('StudentStatusHistory', cascade="all, delete-orphan")
     level_history = db.relationship('StudentLevelHistory', cascade="all, delete-orphan")
-    quizzes = db.relationship('StudentLessonQuiz', cascade="all, delete-orphan")
\ No newline at end of file
+    quizzes = db.relationship('StudentLessonQuiz', cascade="all, delete-orphan")
+
+    def refresh_current_status(self):
+        """Recompute current_status_id/current_status_changed_at from the latest status history record."""
+        latest = StudentStatusHistory.query.filter_by(student_id=self.id).order_by(
+            StudentStatusHistory.changed_at.desc(), StudentStatusHistory.id.desc()
+        ).first()
+        self.current_status_id = latest.status_id if latest else None
+        self.current_status_changed_at = latest.changed_at if latest else None
+
+    def refresh_current_level(self):
+        """Recompute current_level_id/current_level_start_date from the latest level history record."""
+        latest = StudentLevelHistory.query.filter_by(student_id=self.id).order_by(
+            StudentLevelHistory.start_date.desc(), StudentLevelHistory.id.desc()
+        ).first()
+        self.current_level_id = latest.level_id if latest else None
+        self.current_level_start_date = latest.start_date if latest else None
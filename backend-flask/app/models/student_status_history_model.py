@@ -3,7 +3,14 @@ from app.db import db
 
 class StudentStatusHistory(BaseModel):
     __tablename__ = "student_status_history"
+    __table_args__ = (
+        db.Index("ix_student_status_history_student_id_changed_at", "student_id", "changed_at"),
+        db.Index("ix_student_status_history_changed_at_id", "changed_at", "id"),
+    )
 
     student_id = db.Column(db.Integer, db.ForeignKey("student.id", ondelete="CASCADE"), nullable=False)
     status_id = db.Column(db.Integer, db.ForeignKey("student_status.id", ondelete="CASCADE"), nullable=False)
-    changed_at = db.Column(db.DateTime, nullable=False)
\ No newline at end of file
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    # Relationships
+    status = db.relationship("StudentStatus")
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from app.db import db
 
 class StudentStatus(db.Model):
@@ -5,3 +6,5 @@ class StudentStatus(db.Model):
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String, nullable=False)
+    # Versions the statuses for conditional GETs (see check_not_modified), like BaseModel.updated_date
+    updated_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,138 @@
+import logging
+from time import perf_counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from .db import db
+
+# Set once an app enables profiling, so unprofiled processes skip the per-dump bookkeeping
+_enabled = False
+
+
+class RequestProfile:
+    """
+    Costs collected for one request: SQL statements with their durations and time spent serializing.
+    """
+    def __init__(self):
+        self.start = perf_counter()
+        self.queries = []  # (seconds, statement)
+        self.serialize_time = 0.0
+        self.serializing = False
+        # SQL run while serializing (lazy loads) is reported under db, not serialize
+        self.serialize_sql_time = 0.0
+
+    @property
+    def sql_time(self):
+        return sum(seconds for seconds, _ in self.queries)
+
+    @property
+    def serialize_only_time(self):
+        return self.serialize_time - self.serialize_sql_time
+
+    def slowest(self, count):
+        return sorted(self.queries, key=lambda query: query[0], reverse=True)[:count]
+
+
+def current_profile():
+    """The RequestProfile of the current request, or None when profiling is off or outside a request."""
+    if not has_request_context():
+        return None
+    return g.get('request_profile')
+
+
+class serialization_timer:
+    """
+    Add the time spent in the block to the request's serialization time.
+    Nested blocks (a schema dumping its nested schemas) are only counted once.
+    """
+    __slots__ = ('profile', 'start')
+
+    def __enter__(self):
+        profile = current_profile() if _enabled else None
+        if profile is None or profile.serializing:
+            self.profile = None
+            return
+        profile.serializing = True
+        self.profile = profile
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.serialize_time += perf_counter() - self.start
+            self.profile.serializing = False
+
+
+def init_profiling(app):
+    """
+    Opt-in per-request instrumentation, enabled with PROFILE_REQUESTS.
+
+    Records every SQL statement through engine events and the serialization time (schema dumps and
+    JSON encoding) of each request, for every registered blueprint. Each response gets a Server-Timing
+    header (db, serialize, total) and each request a log line. Requests slower than
+    PROFILE_SLOW_REQUEST_MS are logged as warnings with their PROFILE_TOP_QUERIES slowest statements,
+    and statements slower than PROFILE_SLOW_QUERY_MS are logged individually.
+    Call after db.init_app(app).
+    """
+    global _enabled
+    if not app.config.get('PROFILE_REQUESTS'):
+        return
+    _enabled = True
+
+    slow_request = app.config.get('PROFILE_SLOW_REQUEST_MS', 500) / 1000
+    slow_query = app.config.get('PROFILE_SLOW_QUERY_MS', 100) / 1000
+    top_queries = app.config.get('PROFILE_TOP_QUERIES', 3)
+    logger = app.logger
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        seconds = perf_counter() - conn.info['query_start'].pop()
+        profile = current_profile()
+        if profile is None:
+            return
+        profile.queries.append((seconds, statement))
+        if profile.serializing:
+            profile.serialize_sql_time += seconds
+        if seconds >= slow_query:
+            logger.warning(f"Slow query ({seconds * 1000:.1f}ms) in {request.method} {request.path}: {statement}")
+
+    @app.before_request
+    def start_profile():
+        g.request_profile = RequestProfile()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+
+        total = perf_counter() - profile.start
+        sql_time = profile.sql_time
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={sql_time * 1000:.1f};desc="{len(profile.queries)} queries", '
+            f'serialize;dur={profile.serialize_only_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+        summary = (
+            f"{request.method} {request.full_path.rstrip('?')} {response.status_code} {total * 1000:.1f}ms "
+            f"db={sql_time * 1000:.1f}ms ({len(profile.queries)} queries) "
+            f"serialize={profile.serialize_only_time * 1000:.1f}ms"
+        )
+        if total >= slow_request:
+            slowest = ''.join(
+                f"\n  {seconds * 1000:.1f}ms {' '.join(statement.split())[:300]}"
+                for seconds, statement in profile.slowest(top_queries)
+            )
+            logger.warning(f"Slow request: {summary}{slowest}")
+        else:
+            logger.info(summary)
+        return response
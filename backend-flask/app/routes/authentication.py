@@ -9,6 +9,7 @@ from flask_jwt_extended import (
 )
 from datetime import datetime, timedelta, timezone
 from app.models.user_model import User
+from app.metrics import record_jwt_refresh
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -44,6 +45,7 @@ def refresh_expiring_jwts(response):
         if target_timestamp > exp_timestamp:
             access_token = create_access_token(identity=get_jwt_identity(), expires_delta=timedelta(hours=4))
             set_access_cookies(response, access_token)
+            record_jwt_refresh()
         return response
     except (RuntimeError, KeyError):
         return response
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.curriculum_model import Curriculum
 from app.schemas.schemas import CurriculumSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 curriculum_bp = Blueprint('curriculum', __name__)
 
@@ -16,9 +16,11 @@ def get_curriculums():
 
     Query Parameters:
     - name: str (optional) — Filter curriculums by name (partial match).
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of curriculums.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     name = request.args.get('name')
 
@@ -29,9 +31,10 @@ def get_curriculums():
     if name:
         query = query.filter(Curriculum.name.ilike(f'%{name}%'))
 
-    curriculums = query.all()
-    curriculum_schema = CurriculumSchema(many=True)
-    return curriculum_schema.dump(curriculums), 200
+    curriculum_schema = CurriculumSchema.from_request(many=True)
+    check_not_modified(query, curriculum_schema)
+    curriculums = query.options(*curriculum_schema.eager_load_options()).all()
+    return curriculum_schema.dump_response(curriculums), 200
 
 @curriculum_bp.route('/curriculums', methods=['POST'])
 @jwt_required()
@@ -64,7 +67,7 @@ def create_curriculum():
     if not curriculum_data.get("name"):
         return {"message": "name field is required"}, 400
 
-    curriculum_schema = CurriculumSchema()
+    curriculum_schema = CurriculumSchema.cached()
     try:
         curriculum = curriculum_schema.load(curriculum_data)
     except Exception as e:
@@ -72,7 +75,7 @@ def create_curriculum():
 
     db.session.add(curriculum)
     db.session.commit()
-    return curriculum_schema.dump(curriculum), 201
+    return curriculum_schema.dump_response(curriculum), 201
 
 @curriculum_bp.route('/curriculums/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -106,14 +109,14 @@ def update_curriculum(id):
     
     curriculum_data = data['curriculum']
 
-    curriculum_schema = CurriculumSchema(partial=True)
+    curriculum_schema = CurriculumSchema.cached(partial=True)
     try:
         updated_curriculum = curriculum_schema.load(curriculum_data, instance=curriculum, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return curriculum_schema.dump(updated_curriculum), 200
+    return curriculum_schema.dump_response(updated_curriculum), 200
 
 @curriculum_bp.route('/curriculums/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -152,8 +155,10 @@ def get_curriculum(curriculum_id):
 
     Returns:
     - 200: JSON object of the curriculum (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If curriculum not found
     """
-    curriculum = Curriculum.query.get_or_404(curriculum_id)
-    curriculum_schema = CurriculumSchema()
-    return curriculum_schema.dump(curriculum)
\ No newline at end of file
+    curriculum_schema = CurriculumSchema.from_request()
+    check_not_modified(Curriculum.query.filter(Curriculum.id == curriculum_id), curriculum_schema)
+    curriculum = Curriculum.query.options(*curriculum_schema.eager_load_options()).get_or_404(curriculum_id)
+    return curriculum_schema.dump_response(curriculum)
\ No newline at end of file
@@ -2,12 +2,16 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.lesson_model import Lesson
+from app.models.lesson_student_model import LessonStudent
 from app.schemas.schemas import LessonSchema
 from app.models.student_model import Student
 from app.models.quiz_model import Quiz
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, keyset_paginate, offset_paginate, check_not_modified, record_conditional_stamps, stream_ndjson
+from app.schemas.base_schema import stamp_rows, utc_isoformat
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import func
+from marshmallow import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import selectinload
 
 lesson_bp = Blueprint('lessons', __name__)
 
@@ -28,9 +32,17 @@ def get_lessons():
     - do_paginate: bool (optional, default=false) — Whether to return pagination data.
     - page: int (optional, default=1) — Pagination page number.
     - per_page: int (optional, default=20) — Pagination page size.
+    - cursor: str (optional) — Keyset pagination: pass an empty value for the first page, then the returned next_cursor.
+      Takes priority over do_paginate; ordered by datetime then id, most recent first.
+    - with_total: bool (optional, default=false) — Include the total row count in cursor mode (issues a COUNT query).
+    - format: str (optional, "json"/"ndjson", default=json) — ndjson streams every matching row as one JSON object per line;
+      pagination parameters are ignored.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON object with lessons, pagination info.
+    - 200 (format=ndjson): application/x-ndjson stream of the records, one per line.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     
     Note: If no start date is provided but range_length is used, start defaults to today.
     """
@@ -42,6 +54,11 @@ def get_lessons():
     do_paginate = request.args.get('do_paginate', 'false').lower() == 'true'
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
+    response_format = request.args.get('format', 'json').lower()
+    if response_format not in ('json', 'ndjson'):
+        return {"message": "format must be 'json' or 'ndjson'."}, 400
 
     # Build query
     query = Lesson.query
@@ -79,46 +96,176 @@ def get_lessons():
             query = query.filter(Lesson.datetime < end_date)
 
     if group is not None:
+        # Lesson.student_count is maintained on every lesson_student change (ix_lesson_student_count_datetime)
         if group.lower() == "true":
             # Group lessons (lessons with >1 student)
-            group_subq = db.session.query(
-                Lesson.id
-            ).join(Lesson.students).group_by(Lesson.id).having(
-                func.count(Student.id) > 1
-            ).subquery()
-            query = query.filter(Lesson.id.in_(group_subq))
+            query = query.filter(Lesson.student_count > 1)
         elif group.lower() == "false":
             # Individual lessons (lessons with 1 student)
-            individual_subq = db.session.query(
-                Lesson.id
-            ).join(Lesson.students).group_by(Lesson.id).having(
-                func.count(Student.id) == 1
-            ).subquery()
-            query = query.filter(Lesson.id.in_(individual_subq))
+            query = query.filter(Lesson.student_count == 1)
 
     # Order by datetime descending (most recent first)
-    query = query.order_by(Lesson.datetime.desc())
+    query = query.order_by(Lesson.datetime.desc(), Lesson.id.desc())
 
-    schema = LessonSchema(many=True)
+    schema = LessonSchema.from_request(many=True)
     
-    if do_paginate:
+    if response_format == 'ndjson':
+        # Stream every matching row instead of building one document in memory
+        return stream_ndjson(query.options(*schema.eager_load_options()), schema)
+    if cursor is not None:
+        # Keyset pagination: constant cost per page, no COUNT unless requested
+        try:
+            lessons, pagination = keyset_paginate(query, [Lesson.datetime, Lesson.id], cursor, per_page, with_total, schema=schema)
+        except ValueError:
+            return {"message": "Invalid cursor."}, 400
+
+        return {
+            "lessons": schema.dump_response(lessons),
+            "pagination": pagination
+        }
+    elif do_paginate:
         # Paginate and return with pagination metadata
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        lessons = paginated.items
-        
+        lessons, pagination = offset_paginate(query, page, per_page, schema)
+
         return {
-            "lessons": schema.dump(lessons),
-            "pagination": {
-                "page": paginated.page,
-                "pages": paginated.pages,
-                "per_page": paginated.per_page,
-                "total": paginated.total
-            }
+            "lessons": schema.dump_response(lessons),
+            "pagination": pagination
         }
     else:
         # Return all results without pagination
-        lessons = query.all()
-        return {"lessons": schema.dump(lessons)}
+        check_not_modified(query, schema)
+        lessons = query.options(*schema.eager_load_options()).all()
+        return {"lessons": schema.dump_response(lessons)}
+
+# Fields the calendar returns; the ETag of GET /lessons/calendar covers the tables they come from
+CALENDAR_FIELDS = ('id', 'datetime', 'plan', 'student_count', 'students.id', 'students.first_name', 'students.last_name')
+MAX_CALENDAR_DAYS = 42
+
+def _empty_day_totals():
+    return {"lessons": 0, "group_lessons": 0, "individual_lessons": 0, "students": 0}
+
+def _add_to_totals(totals, student_count):
+    totals["lessons"] += 1
+    totals["students"] += student_count
+    if student_count > 1:
+        totals["group_lessons"] += 1
+    elif student_count == 1:
+        totals["individual_lessons"] += 1
+
+@lesson_bp.route('/lessons/calendar', methods=['GET'])
+@jwt_required()
+@response_wrapper
+def get_lesson_calendar():
+    """
+    GET /lessons/calendar
+
+    Description:
+    Lessons of a date range bucketed by day and hour, for the first paint of the week calendar.
+    Lessons carry slim student references (id and name) instead of full student objects, and every day
+    has totals. Computed with a single query over the indexed Lesson.datetime range.
+
+    Query Parameters:
+    - start: str (optional, ISO date) — First day of the range (defaults to the Monday of the current week).
+    - range_length: int (optional, default=7) — Number of days to include, at most 42.
+    - student_id: int (optional) — Only lessons of this student.
+    - group: str (optional, "true"/"false") — Only group (more than one student) or individual lessons.
+
+    Returns:
+    - 200: JSON object with start, end (exclusive), totals and days: [{date, totals, hours: [{hour, lessons: [...]}]}].
+      Every day of the range is listed, with empty hours omitted. Lessons are ordered by datetime.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
+    - 400: If start, range_length or group is invalid
+    """
+    start = request.args.get('start')
+    range_length = request.args.get('range_length', 7, type=int)
+    student_id = request.args.get('student_id', type=int)
+    group = request.args.get('group')
+
+    if start:
+        try:
+            start_date = datetime.fromisoformat(start)
+        except ValueError:
+            return {"message": "Invalid start date format. Use ISO format (YYYY-MM-DD)."}, 400
+        if start_date.tzinfo is not None:
+            start_date = start_date.astimezone(timezone.utc).replace(tzinfo=None)
+    else:
+        today = datetime.now(timezone.utc).replace(tzinfo=None)
+        start_date = today - timedelta(days=today.weekday())
+    start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if not 1 <= range_length <= MAX_CALENDAR_DAYS:
+        return {"message": f"range_length must be between 1 and {MAX_CALENDAR_DAYS}."}, 400
+    end_date = start_date + timedelta(days=range_length)
+
+    conditions = [Lesson.datetime >= start_date, Lesson.datetime < end_date]
+    if student_id:
+        # Uncorrelated, as the lesson query below also joins lesson_student
+        conditions.append(
+            Lesson.id.in_(select(LessonStudent.lesson_id).where(LessonStudent.student_id == student_id))
+        )
+    if group is not None:
+        if group.lower() == "true":
+            conditions.append(Lesson.student_count > 1)
+        elif group.lower() == "false":
+            conditions.append(Lesson.student_count == 1)
+        else:
+            return {"message": "group must be 'true' or 'false'."}, 400
+
+    calendar_schema = LessonSchema.cached(many=True, only=CALENDAR_FIELDS)
+    check_not_modified(Lesson.query.filter(*conditions), calendar_schema)
+
+    # One row per lesson and student (one row with NULL student columns for lessons without students)
+    rows = db.session.execute(
+        select(
+            Lesson.id, Lesson.datetime, Lesson.plan, Lesson.student_count, Lesson.updated_date,
+            Student.id.label('student_id'), Student.first_name, Student.last_name,
+            Student.updated_date.label('student_updated_date')
+        ).select_from(Lesson).outerjoin(
+            LessonStudent, LessonStudent.lesson_id == Lesson.id
+        ).outerjoin(
+            Student, Student.id == LessonStudent.student_id
+        ).where(*conditions).order_by(Lesson.datetime, Lesson.id, Student.first_name, Student.id)
+    )
+
+    days = {
+        (start_date + timedelta(days=offset)).date(): {"hours": {}, "totals": _empty_day_totals()}
+        for offset in range(range_length)
+    }
+    totals = _empty_day_totals()
+    # The rows of the calendar schema's version nodes: the lessons and their students
+    version_rows = ([], [])
+    lesson = None
+    for row in rows:
+        if lesson is None or lesson["id"] != row.id:
+            version_rows[0].append((0, row.id, row.updated_date))
+            lesson = {
+                "id": row.id,
+                "datetime": utc_isoformat(row.datetime),
+                "plan": row.plan,
+                "student_count": row.student_count,
+                "students": []
+            }
+            day = days[row.datetime.date()]
+            day["hours"].setdefault(row.datetime.hour, []).append(lesson)
+            _add_to_totals(day["totals"], row.student_count)
+            _add_to_totals(totals, row.student_count)
+        if row.student_id is not None:
+            lesson["students"].append({"id": row.student_id, "first_name": row.first_name, "last_name": row.last_name})
+            version_rows[1].append((row.id, row.student_id, row.student_updated_date))
+    record_conditional_stamps(calendar_schema, [stamp_rows(node_rows) for node_rows in version_rows])
+
+    return {
+        "start": start_date.date().isoformat(),
+        "end": end_date.date().isoformat(),
+        "totals": totals,
+        "days": [
+            {
+                "date": date.isoformat(),
+                "totals": day["totals"],
+                "hours": [{"hour": hour, "lessons": lessons} for hour, lessons in sorted(day["hours"].items())]
+            }
+            for date, day in days.items()
+        ]
+    }
 
 @lesson_bp.route('/lessons', methods=['POST'])
 @jwt_required()
@@ -149,13 +296,14 @@ def create_lesson():
     lesson_data = data.get("lesson", {})
     student_ids = data.get("student_ids", [])
 
-    lesson_schema = LessonSchema()
+    lesson_schema = LessonSchema.cached()
     lesson = lesson_schema.load(lesson_data, partial=True)
     if student_ids:
         lesson.students = Student.query.filter(Student.id.in_(student_ids)).all()
+        lesson.student_count = len(lesson.students)
     db.session.add(lesson)
     db.session.commit()
-    return lesson_schema.dump(lesson), 201
+    return lesson_schema.dump_response(lesson), 201
 
 @lesson_bp.route('/lessons/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -191,12 +339,13 @@ def update_lesson(id):
     lesson_data = data.get("lesson", {})
     student_ids = data.get("student_ids", [])
 
-    lesson_schema = LessonSchema()
+    lesson_schema = LessonSchema.cached()
     updated_lesson = lesson_schema.load(lesson_data, instance=lesson, partial=True)
     if student_ids:
         lesson.students = Student.query.filter(Student.id.in_(student_ids)).all()
+        lesson.student_count = len(lesson.students)
     db.session.commit()
-    return lesson_schema.dump(updated_lesson), 200
+    return lesson_schema.dump_response(updated_lesson), 200
 
 @lesson_bp.route('/lessons/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -220,6 +369,334 @@ def delete_lesson(id):
     db.session.commit()
     return '', 204
 
+def _bulk_items(data):
+    # Shared body check for the bulk endpoints: a list of objects under "lessons"
+    items = data.get("lessons") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return None
+    return items
+
+def _resolve_bulk_students(items, errors):
+    """
+    Load every student referenced by the items with a single IN query.
+    Returns {index: [Student]} for items that sent student_ids; problems are recorded in errors[index].
+    """
+    requested = {}
+    for index, item in enumerate(items):
+        student_ids = item.get("student_ids")
+        if student_ids is None:
+            continue
+        if not isinstance(student_ids, list) or not all(isinstance(i, int) for i in student_ids):
+            errors.setdefault(index, {})["student_ids"] = ["Must be a list of integers."]
+            continue
+        requested[index] = student_ids
+
+    all_ids = {student_id for student_ids in requested.values() for student_id in student_ids}
+    students_by_id = {
+        student.id: student
+        for student in Student.query.filter(Student.id.in_(all_ids)).all()
+    } if all_ids else {}
+
+    resolved = {}
+    for index, student_ids in requested.items():
+        missing = sorted(set(student_ids) - students_by_id.keys())
+        if missing:
+            errors.setdefault(index, {})["student_ids"] = [f"Unknown student ids: {missing}"]
+            continue
+        resolved[index] = [students_by_id[student_id] for student_id in dict.fromkeys(student_ids)]
+    return resolved
+
+def _bulk_error_results(count, errors):
+    return [
+        {"index": index, "status": "error", "errors": errors[index]} if index in errors
+        else {"index": index, "status": "ok"}
+        for index in range(count)
+    ]
+
+@lesson_bp.route('/lessons/bulk', methods=['POST'])
+@jwt_required()
+@response_wrapper
+def create_lessons_bulk():
+    """
+    POST /lessons/bulk
+
+    Description:
+    Create many lessons in one request and one transaction. Either every lesson is created or none are.
+
+    Request JSON Body:
+    {
+        "lessons": [
+            {
+                "lesson": {
+                    "datetime": str,     # required, ISO date string
+                    "plan": str,         # optional
+                    "concepts": str,     # optional
+                    "notes": str         # optional
+                },
+                "student_ids": [int]     # optional, array of student IDs
+            }
+        ]
+    }
+
+    Returns:
+    - 201: JSON object with per-item results: {"index": int, "status": "created", "lesson": {...}}
+    - 400: If the body is malformed or any item fails validation (results hold the per-item errors, nothing is created)
+    """
+    items = _bulk_items(request.get_json(silent=True))
+    if items is None:
+        return {"message": "A list of lesson objects is required in 'lessons' key"}, 400
+
+    errors = {}
+    lesson_schema = LessonSchema.cached(many=True)
+    try:
+        lessons = lesson_schema.load([item.get("lesson", {}) for item in items])
+    except ValidationError as e:
+        lessons = None
+        for index, messages in e.messages.items():
+            errors.setdefault(index, {}).update(messages)
+
+    students = _resolve_bulk_students(items, errors)
+    if errors:
+        return {"results": _bulk_error_results(len(items), errors)}, 400
+
+    for index, lesson in enumerate(lessons):
+        if index in students:
+            lesson.students = students[index]
+            lesson.student_count = len(students[index])
+    db.session.add_all(lessons)
+    # Flush to assign ids and dump before commit so the response does not reload every lesson
+    db.session.flush()
+    dumped = lesson_schema.dump_response(lessons)
+    db.session.commit()
+
+    return {
+        "results": [
+            {"index": index, "status": "created", "lesson": lesson}
+            for index, lesson in enumerate(dumped)
+        ]
+    }, 201
+
+@lesson_bp.route('/lessons/bulk', methods=['PUT'])
+@jwt_required()
+@response_wrapper
+def update_lessons_bulk():
+    """
+    PUT /lessons/bulk
+
+    Description:
+    Update many lessons in one request and one transaction. Either every lesson is updated or none are.
+
+    Request JSON Body:
+    {
+        "lessons": [
+            {
+                "id": int,               # required, ID of the lesson to update
+                "lesson": {
+                    "datetime": str,     # optional, ISO date string
+                    "plan": str,         # optional
+                    "concepts": str,     # optional
+                    "notes": str         # optional
+                },
+                "student_ids": [int]     # optional, replaces the lesson's students when non-empty
+            }
+        ]
+    }
+
+    Returns:
+    - 200: JSON object with per-item results: {"index": int, "status": "updated", "lesson": {...}}
+    - 400: If the body is malformed, any lesson is not found, an id appears more than once
+           or any item fails validation (nothing is updated)
+    """
+    items = _bulk_items(request.get_json(silent=True))
+    if items is None:
+        return {"message": "A list of lesson objects is required in 'lessons' key"}, 400
+
+    errors = {}
+    ids = [item.get("id") for item in items]
+    lessons_by_id = {
+        lesson.id: lesson
+        for lesson in Lesson.query.options(selectinload(Lesson.students)).filter(
+            Lesson.id.in_([i for i in ids if isinstance(i, int)])
+        ).all()
+    }
+    students = _resolve_bulk_students(items, errors)
+
+    lesson_schema = LessonSchema.cached()
+    updated = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        lesson = lessons_by_id.get(ids[index])
+        if lesson is None:
+            errors.setdefault(index, {})["id"] = ["Lesson not found."]
+            continue
+        if lesson.id in seen_ids:
+            errors.setdefault(index, {})["id"] = ["Duplicate id."]
+            continue
+        seen_ids.add(lesson.id)
+        try:
+            lesson_schema.load(item.get("lesson", {}), instance=lesson, partial=True)
+        except ValidationError as e:
+            errors.setdefault(index, {}).update(e.messages)
+            continue
+        if students.get(index):
+            lesson.students = students[index]
+            lesson.student_count = len(students[index])
+        updated.append(lesson)
+
+    if errors:
+        db.session.rollback()
+        return {"results": _bulk_error_results(len(items), errors)}, 400
+
+    db.session.flush()
+    dumped = LessonSchema.cached(many=True).dump_response(updated)
+    db.session.commit()
+
+    return {
+        "results": [
+            {"index": index, "status": "updated", "lesson": lesson}
+            for index, lesson in enumerate(dumped)
+        ]
+    }, 200
+
+@lesson_bp.route('/lessons/bulk', methods=['DELETE'])
+@jwt_required()
+@response_wrapper
+def delete_lessons_bulk():
+    """
+    DELETE /lessons/bulk
+
+    Description:
+    Delete many lessons in one request and one transaction. Either every lesson is deleted or none are.
+
+    Request JSON Body:
+    {
+        "ids": [int]                     # required, IDs of the lessons to delete
+    }
+
+    Returns:
+    - 200: JSON object with per-item results: {"id": int, "status": "deleted"}
+    - 400: If ids is missing, not a list of integers or lists an id more than once
+           (results mark the repeated ids as "duplicate", nothing is deleted)
+    - 404: If any lesson is not found (results list the missing ids, nothing is deleted)
+    """
+    data = request.get_json(silent=True)
+    ids = data.get("ids") if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return {"message": "A list of lesson IDs is required in 'ids' key"}, 400
+    if len(set(ids)) != len(ids):
+        seen_ids = set()
+        results = []
+        for lesson_id in ids:
+            results.append({"id": lesson_id, "status": "duplicate" if lesson_id in seen_ids else "ok"})
+            seen_ids.add(lesson_id)
+        return {"results": results}, 400
+
+    # Students are loaded up front so removing the lesson_student links does not query per lesson
+    lessons = Lesson.query.options(selectinload(Lesson.students)).filter(Lesson.id.in_(ids)).all()
+    found_ids = {lesson.id for lesson in lessons}
+    if len(found_ids) != len(ids):
+        return {
+            "results": [
+                {"id": lesson_id, "status": "ok" if lesson_id in found_ids else "not_found"}
+                for lesson_id in ids
+            ]
+        }, 404
+
+    for lesson in lessons:
+        db.session.delete(lesson)
+    db.session.commit()
+
+    return {"results": [{"id": lesson_id, "status": "deleted"} for lesson_id in ids]}, 200
+
+@lesson_bp.route('/lessons/copy-week', methods=['POST'])
+@jwt_required()
+@response_wrapper
+def copy_week():
+    """
+    POST /lessons/copy-week
+
+    Description:
+    Copy every lesson (and optionally its student assignments) from a source week to a target week,
+    keeping each lesson's weekday and time. Lessons and links are each inserted in one batched INSERT
+    in a single transaction. Lessons already in the target week are kept.
+
+    Request JSON Body:
+    {
+        "source_start": str,         # required, ISO date of the first day of the source week
+        "target_start": str,         # required, ISO date of the first day of the target week
+        "range_length": int,         # optional, default=7, number of days to copy
+        "include_students": bool     # optional, default=true, also copy lesson-student assignments
+    }
+
+    Returns:
+    - 201: JSON object with lessons_copied and students_copied counts and the target range
+    - 400: If dates are missing or invalid
+    """
+    data = request.get_json(silent=True) or {}
+    range_length = data.get("range_length", 7)
+    include_students = data.get("include_students", True)
+
+    try:
+        source_start = datetime.fromisoformat(data["source_start"])
+        target_start = datetime.fromisoformat(data["target_start"])
+    except (KeyError, TypeError, ValueError):
+        return {"message": "source_start and target_start are required in ISO format (YYYY-MM-DD)."}, 400
+    if not isinstance(range_length, int) or range_length < 1:
+        return {"message": "range_length must be a positive integer."}, 400
+
+    source_end = source_start + timedelta(days=range_length)
+    delta = target_start - source_start
+    if delta == timedelta(0):
+        return {"message": "source_start and target_start must differ."}, 400
+
+    source_lessons = db.session.execute(
+        select(Lesson.id, Lesson.datetime, Lesson.plan, Lesson.concepts, Lesson.notes, Lesson.student_count).where(
+            Lesson.datetime >= source_start,
+            Lesson.datetime < source_end
+        ).order_by(Lesson.id)
+    ).all()
+
+    copy_ids = []
+    if source_lessons:
+        # RETURNING in parameter order gives each copy's id next to its source, so links follow the right lesson
+        copy_ids = db.session.scalars(
+            insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True),
+            [
+                {
+                    "datetime": lesson.datetime + delta,
+                    "plan": lesson.plan,
+                    "concepts": lesson.concepts,
+                    "notes": lesson.notes,
+                    # Copies keep their source's count only when the student links are copied too
+                    "student_count": lesson.student_count if include_students else 0,
+                }
+                for lesson in source_lessons
+            ]
+        ).all()
+
+    students_copied = 0
+    if include_students and copy_ids:
+        copy_id_by_source = {lesson.id: copy_id for lesson, copy_id in zip(source_lessons, copy_ids)}
+        links = db.session.execute(
+            select(LessonStudent.lesson_id, LessonStudent.student_id).where(
+                LessonStudent.lesson_id.in_(copy_id_by_source)
+            )
+        ).all()
+        if links:
+            db.session.execute(
+                insert(LessonStudent),
+                [{"lesson_id": copy_id_by_source[lesson_id], "student_id": student_id} for lesson_id, student_id in links]
+            )
+        students_copied = len(links)
+
+    db.session.commit()
+    return {
+        "lessons_copied": len(copy_ids),
+        "students_copied": students_copied,
+        "target_start": target_start.isoformat(),
+        "target_end": (target_start + timedelta(days=range_length)).isoformat()
+    }, 201
+
 @lesson_bp.route('/lessons/<int:lesson_id>', methods=['GET'])
 @jwt_required()
 @response_wrapper
@@ -235,8 +712,10 @@ def get_lesson(lesson_id):
 
     Returns:
     - 200: JSON object of the lesson (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If lesson not found
     """
-    lesson = Lesson.query.get_or_404(lesson_id)
-    schema = LessonSchema()
-    return schema.dump(lesson)
\ No newline at end of file
+    schema = LessonSchema.from_request()
+    check_not_modified(Lesson.query.filter(Lesson.id == lesson_id), schema)
+    lesson = Lesson.query.options(*schema.eager_load_options()).get_or_404(lesson_id)
+    return schema.dump_response(lesson)
\ No newline at end of file
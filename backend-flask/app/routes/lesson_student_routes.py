@@ -5,7 +5,8 @@ from app.models.lesson_student_model import LessonStudent
 from app.models.lesson_model import Lesson
 from app.models.student_model import Student
 from app.schemas.schemas import LessonStudentSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, offset_paginate, check_not_modified
+from sqlalchemy.exc import IntegrityError
 
 lesson_student_bp = Blueprint('lesson_student', __name__)
 
@@ -25,9 +26,11 @@ def get_lesson_students():
     - do_paginate: bool (optional, default=false) — Whether to return pagination data.
     - page: int (optional, default=1) — Pagination page number.
     - per_page: int (optional, default=20) — Pagination page size.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON object with lesson-students array.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     lesson_id = request.args.get("lesson_id", type=int)
     student_id = request.args.get("student_id", type=int)
@@ -41,27 +44,25 @@ def get_lesson_students():
         query = query.filter_by(lesson_id=lesson_id)
     if student_id:
         query = query.filter_by(student_id=student_id)
-    
-    schema = LessonStudentSchema(many=True)
+
+    # A stable order keeps do_paginate pages from overlapping
+    query = query.order_by(LessonStudent.id)
+
+    schema = LessonStudentSchema.from_request(many=True)
     
     if do_paginate:
         # Paginate and return with pagination metadata
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        lesson_students = paginated.items
-        
+        lesson_students, pagination = offset_paginate(query, page, per_page, schema)
+
         return {
-            "lesson_students": schema.dump(lesson_students),
-            "pagination": {
-                "page": paginated.page,
-                "pages": paginated.pages,
-                "per_page": paginated.per_page,
-                "total": paginated.total
-            }
+            "lesson_students": schema.dump_response(lesson_students),
+            "pagination": pagination
         }
     else:
         # Return all results without pagination
-        lesson_students = query.all()
-        return {"lesson_students": schema.dump(lesson_students)}
+        check_not_modified(query, schema)
+        lesson_students = query.options(*schema.eager_load_options()).all()
+        return {"lesson_students": schema.dump_response(lesson_students)}
 
 @lesson_student_bp.route('/lesson-students', methods=['POST'])
 @jwt_required()
@@ -109,15 +110,21 @@ def create_lesson_student():
     if existing:
         return {"message": "This student is already assigned to the lesson"}, 409
 
-    schema = LessonStudentSchema()
+    schema = LessonStudentSchema.cached()
     try:
         lesson_student = schema.load(lesson_student_data)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.add(lesson_student)
-    db.session.commit()
-    return schema.dump(lesson_student), 201
+    Lesson.adjust_student_count([lesson_id], 1)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent insert of the same pair
+        db.session.rollback()
+        return {"message": "This student is already assigned to the lesson"}, 409
+    return schema.dump_response(lesson_student), 201
 
 @lesson_student_bp.route('/lesson-students/<int:lesson_student_id>', methods=['PUT'])
 @jwt_required()
@@ -169,14 +176,24 @@ def update_lesson_student(lesson_student_id):
         if existing:
             return {"message": "This student is already assigned to the lesson"}, 409
 
-    schema = LessonStudentSchema(partial=True)
+    previous_lesson_id = lesson_student.lesson_id
+    schema = LessonStudentSchema.cached(partial=True)
     try:
         updated_lesson_student = schema.load(lesson_student_data, instance=lesson_student, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
-    db.session.commit()
-    return schema.dump(updated_lesson_student), 200
+    # Moving the link to another lesson changes both lessons' counts
+    if updated_lesson_student.lesson_id != previous_lesson_id:
+        Lesson.adjust_student_count([previous_lesson_id], -1)
+        Lesson.adjust_student_count([updated_lesson_student.lesson_id], 1)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {"message": "This student is already assigned to the lesson"}, 409
+    return schema.dump_response(updated_lesson_student), 200
 
 @lesson_student_bp.route('/lesson-students/<int:lesson_student_id>', methods=['DELETE'])
 @jwt_required()
@@ -199,6 +216,7 @@ def delete_lesson_student(lesson_student_id):
     if not lesson_student:
         return {"message": "Lesson-student association not found"}, 404
     
+    Lesson.adjust_student_count([lesson_student.lesson_id], -1)
     db.session.delete(lesson_student)
     db.session.commit()
     return '', 204
@@ -218,8 +236,10 @@ def get_lesson_student(lesson_student_id):
 
     Returns:
     - 200: JSON object of the lesson-student association (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If lesson-student association not found
     """
-    lesson_student = LessonStudent.query.get_or_404(lesson_student_id)
-    schema = LessonStudentSchema()
-    return schema.dump(lesson_student)
\ No newline at end of file
+    schema = LessonStudentSchema.from_request()
+    check_not_modified(LessonStudent.query.filter(LessonStudent.id == lesson_student_id), schema)
+    lesson_student = LessonStudent.query.options(*schema.eager_load_options()).get_or_404(lesson_student_id)
+    return schema.dump_response(lesson_student)
\ No newline at end of file
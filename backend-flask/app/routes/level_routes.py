@@ -3,8 +3,9 @@ from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.level_model import Level
 from app.models.curriculum_model import Curriculum
+from app.models.student_model import Student
 from app.schemas.schemas import LevelSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 level_bp = Blueprint('level', __name__)
 
@@ -18,9 +19,11 @@ def get_levels():
     Query Parameters:
     - name: str (optional) — Filter levels by name (partial match).
     - curriculum_id: int (optional) — Filter levels by curriculum ID.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of levels.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     name = request.args.get('name')
     curriculum_id = request.args.get('curriculum_id', type=int)
@@ -39,9 +42,10 @@ def get_levels():
     # Order by curriculum_id, then by name for consistent ordering
     query = query.order_by(Level.curriculum_id, Level.name)
 
-    levels = query.all()
-    level_schema = LevelSchema(many=True)
-    return level_schema.dump(levels), 200
+    level_schema = LevelSchema.from_request(many=True)
+    check_not_modified(query, level_schema)
+    levels = query.options(*level_schema.eager_load_options()).all()
+    return level_schema.dump_response(levels), 200
 
 @level_bp.route('/levels', methods=['POST'])
 @jwt_required()
@@ -85,7 +89,7 @@ def create_level():
     if not curriculum:
         return {"message": "Invalid curriculum_id"}, 404
 
-    level_schema = LevelSchema()
+    level_schema = LevelSchema.cached()
     try:
         level = level_schema.load(level_data)
     except Exception as e:
@@ -93,7 +97,7 @@ def create_level():
 
     db.session.add(level)
     db.session.commit()
-    return level_schema.dump(level), 201
+    return level_schema.dump_response(level), 201
 
 @level_bp.route('/levels/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -135,14 +139,14 @@ def update_level(id):
         if not curriculum:
             return {"message": "Invalid curriculum_id"}, 404
 
-    level_schema = LevelSchema(partial=True)
+    level_schema = LevelSchema.cached(partial=True)
     try:
         updated_level = level_schema.load(level_data, instance=level, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return level_schema.dump(updated_level), 200
+    return level_schema.dump_response(updated_level), 200
 
 @level_bp.route('/levels/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -162,7 +166,11 @@ def delete_level(id):
     - 404: If level not found
     """
     level = Level.query.get_or_404(id)
+    # Students currently at this level lose that history record, so recompute their current level
+    affected_students = Student.query.filter(Student.current_level_id == id).all()
     db.session.delete(level)
+    for student in affected_students:
+        student.refresh_current_level()
     db.session.commit()
     return '', 204
 
@@ -181,8 +189,10 @@ def get_level(level_id):
 
     Returns:
     - 200: JSON object of the level (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If level not found
     """
-    level = Level.query.get_or_404(level_id)
-    level_schema = LevelSchema()
-    return level_schema.dump(level)
\ No newline at end of file
+    level_schema = LevelSchema.from_request()
+    check_not_modified(Level.query.filter(Level.id == level_id), level_schema)
+    level = Level.query.options(*level_schema.eager_load_options()).get_or_404(level_id)
+    return level_schema.dump_response(level)
\ No newline at end of file
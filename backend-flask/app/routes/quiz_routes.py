@@ -4,7 +4,7 @@ from app.db import db
 from app.models.quiz_model import Quiz
 from app.models.unit_model import Unit
 from app.schemas.schemas import QuizSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 quiz_bp = Blueprint('quiz', __name__)
 
@@ -18,9 +18,11 @@ def get_quizzes():
     Query Parameters:
     - name: str (optional) — Filter quizzes by name (partial match).
     - unit_id: int (optional) — Filter quizzes by unit ID.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of quizzes.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     name = request.args.get('name')
     unit_id = request.args.get('unit_id', type=int)
@@ -39,9 +41,10 @@ def get_quizzes():
     # Order by unit_id, then by name for consistent ordering
     query = query.order_by(Quiz.unit_id, Quiz.name)
 
-    quizzes = query.all()
-    schema = QuizSchema(many=True)
-    return schema.dump(quizzes), 200
+    schema = QuizSchema.from_request(many=True)
+    check_not_modified(query, schema)
+    quizzes = query.options(*schema.eager_load_options()).all()
+    return schema.dump_response(quizzes), 200
 
 @quiz_bp.route('/quizzes', methods=['POST'])
 @jwt_required()
@@ -87,7 +90,7 @@ def create_quiz():
         if not unit:
             return {"message": "Invalid unit_id"}, 404
 
-    schema = QuizSchema()
+    schema = QuizSchema.cached()
     try:
         quiz = schema.load(quiz_data)
     except Exception as e:
@@ -95,7 +98,7 @@ def create_quiz():
 
     db.session.add(quiz)
     db.session.commit()
-    return schema.dump(quiz), 201
+    return schema.dump_response(quiz), 201
 
 @quiz_bp.route('/quizzes/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -138,14 +141,14 @@ def update_quiz(id):
         if not unit:
             return {"message": "Invalid unit_id"}, 404
 
-    schema = QuizSchema(partial=True)
+    schema = QuizSchema.cached(partial=True)
     try:
         updated_quiz = schema.load(quiz_data, instance=quiz, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return schema.dump(updated_quiz), 200
+    return schema.dump_response(updated_quiz), 200
 
 @quiz_bp.route('/quizzes/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -184,8 +187,10 @@ def get_quiz(quiz_id):
 
     Returns:
     - 200: JSON object of the quiz (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If quiz not found
     """
-    quiz = Quiz.query.get_or_404(quiz_id)
-    schema = QuizSchema()
-    return schema.dump(quiz)
+    schema = QuizSchema.from_request()
+    check_not_modified(Quiz.query.filter(Quiz.id == quiz_id), schema)
+    quiz = Quiz.query.options(*schema.eager_load_options()).get_or_404(quiz_id)
+    return schema.dump_response(quiz)
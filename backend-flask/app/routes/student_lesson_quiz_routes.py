@@ -5,8 +5,11 @@ from app.models.student_lesson_quiz_model import StudentLessonQuiz
 from app.models.student_model import Student
 from app.models.lesson_model import Lesson
 from app.models.quiz_model import Quiz
+from app.models.unit_model import Unit
+from app.models.level_model import Level
 from app.schemas.schemas import StudentLessonQuizSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, keyset_paginate, offset_paginate, check_not_modified, stream_ndjson
+from sqlalchemy import case, func, select
 
 student_lesson_quiz_bp = Blueprint('student_lesson_quiz', __name__)
 
@@ -24,9 +27,17 @@ def get_student_lesson_quizzes():
     - do_paginate: bool (optional, default=false) — Whether to return pagination data.
     - page: int (optional, default=1) — Pagination page number.
     - per_page: int (optional, default=20) — Pagination page size.
+    - cursor: str (optional) — Keyset pagination: pass an empty value for the first page, then the returned next_cursor.
+      Takes priority over do_paginate; ordered by created_date then id, most recent first.
+    - with_total: bool (optional, default=false) — Include the total row count in cursor mode (issues a COUNT query).
+    - format: str (optional, "json"/"ndjson", default=json) — ndjson streams every matching row as one JSON object per line;
+      pagination parameters are ignored.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON object with records array.
+    - 200 (format=ndjson): application/x-ndjson stream of the records, one per line.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     student_id = request.args.get('student_id', type=int)
     lesson_id = request.args.get('lesson_id', type=int)
@@ -34,6 +45,11 @@ def get_student_lesson_quizzes():
     do_paginate = request.args.get('do_paginate', 'false').lower() == 'true'
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
+    response_format = request.args.get('format', 'json').lower()
+    if response_format not in ('json', 'ndjson'):
+        return {"message": "format must be 'json' or 'ndjson'."}, 400
 
     # Build query
     query = StudentLessonQuiz.query
@@ -47,28 +63,154 @@ def get_student_lesson_quizzes():
         query = query.filter(StudentLessonQuiz.quiz_id == quiz_id)
 
     # Order by created_date descending (most recent first)
-    query = query.order_by(StudentLessonQuiz.created_date.desc())
+    query = query.order_by(StudentLessonQuiz.created_date.desc(), StudentLessonQuiz.id.desc())
 
-    schema = StudentLessonQuizSchema(many=True)
+    schema = StudentLessonQuizSchema.from_request(many=True)
     
-    if do_paginate:
+    if response_format == 'ndjson':
+        # Stream every matching row instead of building one document in memory
+        return stream_ndjson(query.options(*schema.eager_load_options()), schema)
+    if cursor is not None:
+        # Keyset pagination: constant cost per page, no COUNT unless requested
+        try:
+            records, pagination = keyset_paginate(query, [StudentLessonQuiz.created_date, StudentLessonQuiz.id], cursor, per_page, with_total, schema=schema)
+        except ValueError:
+            return {"message": "Invalid cursor."}, 400
+
+        return {
+            "student_lesson_quizzes": schema.dump_response(records),
+            "pagination": pagination
+        }
+    elif do_paginate:
         # Paginate and return with pagination metadata
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        records = paginated.items
-        
+        records, pagination = offset_paginate(query, page, per_page, schema)
+
         return {
-            "student_lesson_quizzes": schema.dump(records),
-            "pagination": {
-                "page": paginated.page,
-                "pages": paginated.pages,
-                "per_page": paginated.per_page,
-                "total": paginated.total
-            }
+            "student_lesson_quizzes": schema.dump_response(records),
+            "pagination": pagination
         }
     else:
         # Return all results without pagination
-        records = query.all()
-        return {"student_lesson_quizzes": schema.dump(records)}
+        check_not_modified(query, schema)
+        records = query.options(*schema.eager_load_options()).all()
+        return {"student_lesson_quizzes": schema.dump_response(records)}
+
+def _average(value):
+    # avg() is a Decimal on PostgreSQL and a float on SQLite
+    return round(float(value), 2) if value is not None else None
+
+@student_lesson_quiz_bp.route('/student-lesson-quizzes/gradebook', methods=['GET'])
+@jwt_required()
+@response_wrapper
+def get_gradebook():
+    """
+    GET /student-lesson-quizzes/gradebook
+
+    Description:
+    Quiz results of a level or unit as a students x quizzes matrix, aggregated in the database.
+    Each cell holds the student's best and latest points (latest by lesson date) and number of attempts
+    for that quiz; each quiz also carries how many students took it, the total attempts and the average
+    best and latest points. Only students with at least one result are listed.
+
+    Query Parameters:
+    - level_id: int — Quizzes of every unit of this level (exactly one of level_id and unit_id is required).
+    - unit_id: int — Quizzes of this unit.
+
+    Returns:
+    - 200: JSON object with quizzes (ordered by unit then id), students (ordered by name) and grades,
+      where grades[i][j] is [best, latest, attempts] of students[i] for quizzes[j], or null if not taken.
+    - 400: If neither or both of level_id and unit_id are given
+    - 404: If the level or unit is not found
+    """
+    level_id = request.args.get('level_id', type=int)
+    unit_id = request.args.get('unit_id', type=int)
+    if (level_id is None) == (unit_id is None):
+        return {"message": "Exactly one of level_id and unit_id is required."}, 400
+
+    if level_id is not None:
+        if db.session.get(Level, level_id) is None:
+            return {"message": "Level not found"}, 404
+        quiz_filter = Unit.level_id == level_id
+    else:
+        if db.session.get(Unit, unit_id) is None:
+            return {"message": "Unit not found"}, 404
+        quiz_filter = Unit.id == unit_id
+
+    quiz_ids = select(Quiz.id).join(Unit, Quiz.unit_id == Unit.id).where(quiz_filter)
+
+    # Every attempt, numbered from the most recent lesson per student and quiz
+    attempts = select(
+        StudentLessonQuiz.student_id,
+        StudentLessonQuiz.quiz_id,
+        StudentLessonQuiz.points,
+        func.row_number().over(
+            partition_by=(StudentLessonQuiz.student_id, StudentLessonQuiz.quiz_id),
+            order_by=(Lesson.datetime.desc(), StudentLessonQuiz.id.desc())
+        ).label('recency')
+    ).join(Lesson, Lesson.id == StudentLessonQuiz.lesson_id).where(
+        StudentLessonQuiz.quiz_id.in_(quiz_ids)
+    ).subquery()
+
+    # One row per student and quiz
+    cells = select(
+        attempts.c.student_id,
+        attempts.c.quiz_id,
+        func.max(attempts.c.points).label('best'),
+        func.max(case((attempts.c.recency == 1, attempts.c.points))).label('latest'),
+        func.count().label('attempts')
+    ).group_by(attempts.c.student_id, attempts.c.quiz_id).subquery()
+
+    quizzes = db.session.execute(
+        select(
+            Quiz.id, Quiz.name, Quiz.max_points, Quiz.unit_id,
+            func.count(cells.c.student_id).label('students'),
+            func.coalesce(func.sum(cells.c.attempts), 0).label('attempts'),
+            func.avg(cells.c.best).label('average_best'),
+            func.avg(cells.c.latest).label('average_latest')
+        ).join(Unit, Quiz.unit_id == Unit.id).outerjoin(
+            cells, cells.c.quiz_id == Quiz.id
+        ).where(quiz_filter).group_by(
+            Quiz.id, Quiz.name, Quiz.max_points, Quiz.unit_id, Unit.id
+        ).order_by(Unit.id, Quiz.id)
+    ).all()
+
+    rows = db.session.execute(
+        select(
+            cells.c.student_id, Student.first_name, Student.last_name,
+            cells.c.quiz_id, cells.c.best, cells.c.latest, cells.c.attempts
+        ).join(Student, Student.id == cells.c.student_id).order_by(
+            Student.first_name, Student.last_name, Student.id
+        )
+    ).all()
+
+    column = {quiz.id: index for index, quiz in enumerate(quizzes)}
+    students = []
+    grades = []
+    for row in rows:
+        if not students or students[-1]["id"] != row.student_id:
+            students.append({"id": row.student_id, "first_name": row.first_name, "last_name": row.last_name})
+            grades.append([None] * len(quizzes))
+        grades[-1][column[row.quiz_id]] = [row.best, row.latest, row.attempts]
+
+    return {
+        "level_id": level_id,
+        "unit_id": unit_id,
+        "quizzes": [
+            {
+                "id": quiz.id,
+                "name": quiz.name,
+                "max_points": quiz.max_points,
+                "unit_id": quiz.unit_id,
+                "students": quiz.students,
+                "attempts": quiz.attempts,
+                "average_best": _average(quiz.average_best),
+                "average_latest": _average(quiz.average_latest)
+            }
+            for quiz in quizzes
+        ],
+        "students": students,
+        "grades": grades
+    }
 
 @student_lesson_quiz_bp.route('/student-lesson-quizzes', methods=['POST'])
 @jwt_required()
@@ -128,7 +270,7 @@ def create_student_lesson_quiz():
         if not quiz:
             return {"message": "Invalid quiz_id"}, 404
 
-    schema = StudentLessonQuizSchema()
+    schema = StudentLessonQuizSchema.cached()
     try:
         record = schema.load(record_data)
     except Exception as e:
@@ -136,7 +278,7 @@ def create_student_lesson_quiz():
 
     db.session.add(record)
     db.session.commit()
-    return schema.dump(record), 201
+    return schema.dump_response(record), 201
 
 @student_lesson_quiz_bp.route('/student-lesson-quizzes/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -193,14 +335,14 @@ def update_student_lesson_quiz(id):
         if not quiz:
             return {"message": "Invalid quiz_id"}, 404
 
-    schema = StudentLessonQuizSchema(partial=True)
+    schema = StudentLessonQuizSchema.cached(partial=True)
     try:
         updated_record = schema.load(record_data, instance=record, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return schema.dump(updated_record), 200
+    return schema.dump_response(updated_record), 200
 
 @student_lesson_quiz_bp.route('/student-lesson-quizzes/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -239,8 +381,10 @@ def get_student_lesson_quiz_record(record_id):
 
     Returns:
     - 200: JSON object of the student lesson quiz record (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If student lesson quiz record not found
     """
-    record = StudentLessonQuiz.query.get_or_404(record_id)
-    schema = StudentLessonQuizSchema()
-    return schema.dump(record)
+    schema = StudentLessonQuizSchema.from_request()
+    check_not_modified(StudentLessonQuiz.query.filter(StudentLessonQuiz.id == record_id), schema)
+    record = StudentLessonQuiz.query.options(*schema.eager_load_options()).get_or_404(record_id)
+    return schema.dump_response(record)
@@ -2,14 +2,19 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.student_model import Student
-from app.models.student_status_history_model import StudentStatusHistory
-from app.models.student_level_history_model import StudentLevelHistory
 from app.models.student_status_model import StudentStatus
 from app.models.level_model import Level
 from app.models.lesson_model import Lesson
-from app.schemas.schemas import StudentSchema
-from sqlalchemy import func, and_, or_
-from app.routes.utils import response_wrapper
+from app.models.lesson_student_model import LessonStudent
+from app.models.student_status_history_model import StudentStatusHistory
+from app.models.student_level_history_model import StudentLevelHistory
+from app.models.student_lesson_quiz_model import StudentLessonQuiz
+from app.schemas.schemas import (
+    StudentSchema, LessonSchema, StudentStatusHistorySchema, StudentLevelHistorySchema, StudentLessonQuizSchema
+)
+from datetime import datetime, timezone
+from sqlalchemy import func, or_, select
+from app.routes.utils import response_wrapper, keyset_paginate, offset_paginate, check_not_modified, check_content_not_modified, stream_ndjson
 
 student_bp = Blueprint('student', __name__)
 
@@ -21,20 +26,29 @@ def get_students():
     GET /students
 
     Query Parameters:
-    - status: str (optional) — Filter by current status (from StudentStatusHistory).
-    - level: str (optional) — Filter by current level (from StudentLevelHistory).
+    - status: str (optional) — Filter by current status name (Student.current_status_id, kept in sync with StudentStatusHistory).
+    - level: str (optional) — Filter by current level name (Student.current_level_id, kept in sync with StudentLevelHistory).
     - search: str (optional) — Search by first name or last name (case-insensitive).
     - lesson_start: str (optional, ISO date) — Filter students who had lessons after this date.
     - lesson_end: str (optional, ISO date) — Filter students who had lessons before this date.
-    - is_in_group: str (optional, "true"/"false") — Filter students who had group lessons (multiple students in one lesson).
+    - is_in_group: str (optional, "true"/"false") — Filter students who had group lessons (multiple students in one lesson),
+      or individual lessons with "false". Combined with lesson_start/lesson_end, the lesson must also be in that range.
     - started_after: str (optional, ISO date) — Filter students who started after this date.
     - classes_per_week: int (optional) — Filter by number of classes per week.
     - do_paginate: bool (optional, default=false) — Whether to return pagination data.
     - page: int (optional, default=1) — Pagination page number.
     - per_page: int (optional, default=20) — Pagination page size.
+    - cursor: str (optional) — Keyset pagination: pass an empty value for the first page, then the returned next_cursor.
+      Takes priority over do_paginate; ordered by id.
+    - with_total: bool (optional, default=false) — Include the total row count in cursor mode (issues a COUNT query).
+    - format: str (optional, "json"/"ndjson", default=json) — ndjson streams every matching row as one JSON object per line;
+      pagination parameters are ignored.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON object with students, pagination info.
+    - 200 (format=ndjson): application/x-ndjson stream of the records, one per line.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     status = request.args.get("status")
     level = request.args.get("level")
@@ -47,6 +61,11 @@ def get_students():
     do_paginate = request.args.get('do_paginate', 'false').lower() == 'true'
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per_page", 20))
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
+    response_format = request.args.get('format', 'json').lower()
+    if response_format not in ('json', 'ndjson'):
+        return {"message": "format must be 'json' or 'ndjson'."}, 400
 
     query = Student.query
 
@@ -60,61 +79,35 @@ def get_students():
             )
         )
 
-    # Filter by current status (latest StudentStatusHistory)
+    # Filter by current status (denormalized from the latest StudentStatusHistory)
     if status:
-        subq = db.session.query(
-            StudentStatusHistory.student_id,
-            func.max(StudentStatusHistory.changed_at).label("max_changed_at")
-        ).group_by(StudentStatusHistory.student_id).subquery()
-
         query = query.join(
-            subq, Student.id == subq.c.student_id
-        ).join(
-            StudentStatusHistory,
-            and_(
-                StudentStatusHistory.student_id == subq.c.student_id,
-                StudentStatusHistory.changed_at == subq.c.max_changed_at
-            )
-        ).join(
-            StudentStatus, StudentStatusHistory.status_id == StudentStatus.id
+            StudentStatus, Student.current_status_id == StudentStatus.id
         ).filter(StudentStatus.name == status)
 
-    # Filter by current level (latest StudentLevelHistory)
+    # Filter by current level (denormalized from the latest StudentLevelHistory)
     if level:
-        subq = db.session.query(
-            StudentLevelHistory.student_id,
-            func.max(StudentLevelHistory.start_date).label("max_start_date")
-        ).group_by(StudentLevelHistory.student_id).subquery()
-
         query = query.join(
-            subq, Student.id == subq.c.student_id
-        ).join(
-            StudentLevelHistory,
-            and_(
-                StudentLevelHistory.student_id == subq.c.student_id,
-                StudentLevelHistory.start_date == subq.c.max_start_date
-            )
-        ).join(
-            Level, StudentLevelHistory.level_id == Level.id
+            Level, Student.current_level_id == Level.id
         ).filter(Level.name == level)
 
-    # Filter by students who had lessons in a time range
-    if lesson_start or lesson_end:
-        query = query.join(Student.lessons)
+    # Filter by lessons (in a time range and/or group vs. individual) with one correlated EXISTS:
+    # each student is returned once however many lessons match, so pagination totals stay correct.
+    # Probes ix_lesson_student_student_id_lesson_id, then the lesson by primary key.
+    if lesson_start or lesson_end or is_in_group is not None:
+        student_lesson = select(LessonStudent.lesson_id).join(
+            Lesson, Lesson.id == LessonStudent.lesson_id
+        ).where(LessonStudent.student_id == Student.id)
         if lesson_start:
-            query = query.filter(Lesson.datetime >= lesson_start)
+            student_lesson = student_lesson.where(Lesson.datetime >= lesson_start)
         if lesson_end:
-            query = query.filter(Lesson.datetime <= lesson_end)
-
-    # Filter by group lessons (lessons with >1 student)
-    if is_in_group is not None:
-        query = query.join(Student.lessons)
-        group_subq = db.session.query(
-            Lesson.id
-        ).join(Lesson.students).group_by(Lesson.id).having(
-            func.count(Student.id) > 1 if is_in_group == "true" else func.count(Student.id) == 1
-        ).subquery()
-        query = query.filter(Lesson.id.in_(group_subq))
+            student_lesson = student_lesson.where(Lesson.datetime <= lesson_end)
+        if is_in_group is not None:
+            # Lesson.student_count is maintained on every lesson_student change
+            student_lesson = student_lesson.where(
+                Lesson.student_count > 1 if is_in_group == "true" else Lesson.student_count == 1
+            )
+        query = query.filter(student_lesson.exists())
 
     # Filter by students who started after a given date
     if started_after:
@@ -124,26 +117,38 @@ def get_students():
     if classes_per_week:
         query = query.filter(Student.classes_per_week == int(classes_per_week))
 
-    schema = StudentSchema(many=True)
+    # A stable order keeps do_paginate pages from overlapping
+    query = query.order_by(Student.id)
+
+    schema = StudentSchema.from_request(many=True)
     
-    if do_paginate:
+    if response_format == 'ndjson':
+        # Stream every matching row instead of building one document in memory
+        return stream_ndjson(query.options(*schema.eager_load_options()), schema)
+    if cursor is not None:
+        # Keyset pagination: constant cost per page, no COUNT unless requested
+        try:
+            students, pagination = keyset_paginate(query, [Student.id], cursor, per_page, with_total, descending=False, schema=schema)
+        except ValueError:
+            return {"message": "Invalid cursor."}, 400
+
+        return {
+            "students": schema.dump_response(students),
+            "pagination": pagination
+        }
+    elif do_paginate:
         # Paginate and return with pagination metadata
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        students = paginated.items
-        
+        students, pagination = offset_paginate(query, page, per_page, schema)
+
         return {
-            "students": schema.dump(students),
-            "pagination": {
-                "page": paginated.page,
-                "pages": paginated.pages,
-                "per_page": paginated.per_page,
-                "total": paginated.total
-            }
+            "students": schema.dump_response(students),
+            "pagination": pagination
         }
     else:
         # Return all results without pagination
-        students = query.all()
-        return {"students": schema.dump(students)}
+        check_not_modified(query, schema)
+        students = query.options(*schema.eager_load_options()).all()
+        return {"students": schema.dump_response(students)}
 
 @student_bp.route('/students', methods=['POST'])
 @jwt_required()
@@ -178,7 +183,7 @@ def create_student():
         return {"message": "Student data is required in 'student' key"}, 400
     
     student_data = data['student']
-    schema = StudentSchema()
+    schema = StudentSchema.cached()
     try:
         student = schema.load(student_data)
     except Exception as e:
@@ -186,7 +191,7 @@ def create_student():
 
     db.session.add(student)
     db.session.commit()
-    return schema.dump(student), 201
+    return schema.dump_response(student), 201
 
 @student_bp.route('/students/<int:student_id>', methods=['PUT'])
 @jwt_required()
@@ -229,14 +234,14 @@ def update_student(student_id):
         return {"message": "Student data is required in 'student' key"}, 400
     
     student_data = data['student']
-    schema = StudentSchema(partial=True)
+    schema = StudentSchema.cached(partial=True)
     try:
         updated_student = schema.load(student_data, instance=student, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return schema.dump(updated_student), 200
+    return schema.dump_response(updated_student), 200
 
 @student_bp.route('/students/<int:student_id>', methods=['DELETE'])
 @jwt_required()
@@ -259,6 +264,10 @@ def delete_student(student_id):
     if not student:
         return {"message": "Student not found"}, 404
 
+    # Deleting the student removes their lesson_student links
+    Lesson.adjust_student_count(
+        db.session.scalars(select(LessonStudent.lesson_id).where(LessonStudent.student_id == student_id)), -1
+    )
     db.session.delete(student)
     db.session.commit()
     return {}, 204
@@ -278,11 +287,104 @@ def get_student(student_id):
 
     Returns:
     - 200: JSON object of the student (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If student not found
     """
-    student = Student.query.get(student_id)
+    schema = StudentSchema.from_request()
+    check_not_modified(Student.query.filter(Student.id == student_id), schema)
+    student = Student.query.options(*schema.eager_load_options()).get(student_id)
     if not student:
         return {"message": "Student not found"}, 404
     
-    schema = StudentSchema()
-    return schema.dump(student)
\ No newline at end of file
+    return schema.dump_response(student)
+
+
+# Default and maximum number of recent/upcoming lessons and quiz results in GET /students/<id>/overview
+OVERVIEW_LIMIT = 10
+MAX_OVERVIEW_LIMIT = 100
+
+@student_bp.route('/students/<int:student_id>/overview', methods=['GET'])
+@jwt_required()
+@response_wrapper
+def get_student_overview(student_id):
+    """
+    GET /students/<student_id>/overview
+
+    Description:
+    Everything the student detail page shows, in one response and a fixed number of queries (six,
+    whatever the student's history): the student, their full status and level histories, their most
+    recent and next upcoming lessons, their latest quiz results, and total lesson and quiz counts.
+    Each history entry includes its status or level.
+
+    Path Parameters:
+    - student_id: int — The ID of the student.
+
+    Query Parameters:
+    - lesson_limit: int (optional, default=10, max=100) — Number of recent and of upcoming lessons.
+    - quiz_limit: int (optional, default=10, max=100) — Number of latest quiz results.
+
+    Returns:
+    - 200: JSON object with student, status_history and level_history (oldest first), recent_lessons
+      (most recent first), upcoming_lessons (soonest first), quizzes (latest first), lesson_count and quiz_count.
+    - 304: If the client's cached copy (If-None-Match) is still current; the response is still built to compare it
+    - 400: If a limit is not between 1 and 100
+    - 404: If student not found
+    """
+    lesson_limit = request.args.get('lesson_limit', OVERVIEW_LIMIT, type=int)
+    quiz_limit = request.args.get('quiz_limit', OVERVIEW_LIMIT, type=int)
+    if not (1 <= lesson_limit <= MAX_OVERVIEW_LIMIT and 1 <= quiz_limit <= MAX_OVERVIEW_LIMIT):
+        return {"message": f"lesson_limit and quiz_limit must be between 1 and {MAX_OVERVIEW_LIMIT}."}, 400
+
+    lesson_count = select(func.count(LessonStudent.id)).where(
+        LessonStudent.student_id == Student.id
+    ).scalar_subquery()
+    quiz_count = select(func.count(StudentLessonQuiz.id)).where(
+        StudentLessonQuiz.student_id == Student.id
+    ).scalar_subquery()
+    row = db.session.execute(
+        select(Student, lesson_count, quiz_count).where(Student.id == student_id)
+    ).one_or_none()
+    if row is None:
+        return {"message": "Student not found"}, 404
+    student, lesson_count, quiz_count = row
+
+    # Each history row carries its status/level (and the level's curriculum), joined in the same query
+    status_history_schema = StudentStatusHistorySchema.cached(many=True, exclude=('student',))
+    level_history_schema = StudentLevelHistorySchema.cached(many=True, exclude=('student',))
+    status_history = StudentStatusHistory.query.filter_by(student_id=student_id).options(
+        *status_history_schema.eager_load_options()
+    ).order_by(StudentStatusHistory.changed_at, StudentStatusHistory.id).all()
+    level_history = StudentLevelHistory.query.filter_by(student_id=student_id).options(
+        *level_history_schema.eager_load_options()
+    ).order_by(StudentLevelHistory.start_date, StudentLevelHistory.id).all()
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    student_lessons = Lesson.query.join(LessonStudent, LessonStudent.lesson_id == Lesson.id).filter(
+        LessonStudent.student_id == student_id
+    )
+    recent_lessons = student_lessons.filter(Lesson.datetime < now).order_by(
+        Lesson.datetime.desc(), Lesson.id.desc()
+    ).limit(lesson_limit).all()
+    upcoming_lessons = student_lessons.filter(Lesson.datetime >= now).order_by(
+        Lesson.datetime, Lesson.id
+    ).limit(lesson_limit).all()
+
+    quizzes = StudentLessonQuiz.query.filter_by(student_id=student_id).order_by(
+        StudentLessonQuiz.created_date.desc(), StudentLessonQuiz.id.desc()
+    ).limit(quiz_limit).all()
+
+    # Nested collections are excluded: everything they would load is returned at the top level
+    lesson_schema = LessonSchema.cached(many=True, exclude=('students',))
+    overview = {
+        "student": StudentSchema.cached(exclude=('lessons', 'status_history', 'level_history', 'quizzes')).dump_response(student),
+        "status_history": status_history_schema.dump_response(status_history),
+        "level_history": level_history_schema.dump_response(level_history),
+        "recent_lessons": lesson_schema.dump_response(recent_lessons),
+        "upcoming_lessons": lesson_schema.dump_response(upcoming_lessons),
+        "quizzes": StudentLessonQuizSchema.cached(many=True, exclude=('student', 'lesson', 'quiz')).dump_response(quizzes),
+        "lesson_count": lesson_count,
+        "quiz_count": quiz_count
+    }
+    # Its recent/upcoming split moves with the clock and its slices are capped, so no row stamp covers it
+    check_content_not_modified(overview)
+    return overview
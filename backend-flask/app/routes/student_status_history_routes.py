@@ -5,7 +5,7 @@ from app.models.student_status_history_model import StudentStatusHistory
 from app.models.student_model import Student
 from app.models.student_status_model import StudentStatus
 from app.schemas.schemas import StudentStatusHistorySchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, keyset_paginate, offset_paginate, check_not_modified, stream_ndjson
 
 student_status_history_bp = Blueprint('student_status_history', __name__)
 
@@ -24,9 +24,17 @@ def get_student_status_history():
     - do_paginate: bool (optional, default=false) — Whether to return pagination data.
     - page: int (optional, default=1) — Pagination page number.
     - per_page: int (optional, default=20) — Pagination page size.
+    - cursor: str (optional) — Keyset pagination: pass an empty value for the first page, then the returned next_cursor.
+      Takes priority over do_paginate; ordered by changed_at then id, most recent first.
+    - with_total: bool (optional, default=false) — Include the total row count in cursor mode (issues a COUNT query).
+    - format: str (optional, "json"/"ndjson", default=json) — ndjson streams every matching row as one JSON object per line;
+      pagination parameters are ignored.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of history records.
+    - 200 (format=ndjson): application/x-ndjson stream of the records, one per line.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     student_id = request.args.get('student_id', type=int)
     status_id = request.args.get('status_id', type=int)
@@ -35,6 +43,11 @@ def get_student_status_history():
     do_paginate = request.args.get('do_paginate', 'false').lower() == 'true'
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
+    response_format = request.args.get('format', 'json').lower()
+    if response_format not in ('json', 'ndjson'):
+        return {"message": "format must be 'json' or 'ndjson'."}, 400
 
     # Build query
     query = StudentStatusHistory.query
@@ -65,28 +78,37 @@ def get_student_status_history():
             return {"message": "Invalid end_date format. Use ISO format."}, 400
 
     # Order by changed_at descending (most recent first)
-    query = query.order_by(StudentStatusHistory.changed_at.desc())
+    query = query.order_by(StudentStatusHistory.changed_at.desc(), StudentStatusHistory.id.desc())
 
-    schema = StudentStatusHistorySchema(many=True)
+    schema = StudentStatusHistorySchema.from_request(many=True)
     
-    if do_paginate:
+    if response_format == 'ndjson':
+        # Stream every matching row instead of building one document in memory
+        return stream_ndjson(query.options(*schema.eager_load_options()), schema)
+    if cursor is not None:
+        # Keyset pagination: constant cost per page, no COUNT unless requested
+        try:
+            records, pagination = keyset_paginate(query, [StudentStatusHistory.changed_at, StudentStatusHistory.id], cursor, per_page, with_total, schema=schema)
+        except ValueError:
+            return {"message": "Invalid cursor."}, 400
+
+        return {
+            "student_status_history": schema.dump_response(records),
+            "pagination": pagination
+        }
+    elif do_paginate:
         # Paginate and return with pagination metadata
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-        records = paginated.items
-        
+        records, pagination = offset_paginate(query, page, per_page, schema)
+
         return {
-            "student_status_history": schema.dump(records),
-            "pagination": {
-                "page": paginated.page,
-                "pages": paginated.pages,
-                "per_page": paginated.per_page,
-                "total": paginated.total
-            }
+            "student_status_history": schema.dump_response(records),
+            "pagination": pagination
         }
     else:
         # Return all results without pagination
-        records = query.all()
-        return {"student_status_history": schema.dump(records)}
+        check_not_modified(query, schema)
+        records = query.options(*schema.eager_load_options()).all()
+        return {"student_status_history": schema.dump_response(records)}
 
 @student_status_history_bp.route('/student-status-history', methods=['POST'])
 @jwt_required()
@@ -140,15 +162,16 @@ def create_student_status_history():
     if not status:
         return {"message": "Invalid status_id"}, 404
 
-    schema = StudentStatusHistorySchema()
+    schema = StudentStatusHistorySchema.cached()
     try:
         record = schema.load(history_data)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.add(record)
+    student.refresh_current_status()
     db.session.commit()
-    return schema.dump(record), 201
+    return schema.dump_response(record), 201
 
 @student_status_history_bp.route('/student-status-history/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -198,14 +221,18 @@ def update_student_status_history(id):
         if not status:
             return {"message": "Invalid status_id"}, 404
 
-    schema = StudentStatusHistorySchema(partial=True)
+    previous_student_id = record.student_id
+    schema = StudentStatusHistorySchema.cached(partial=True)
     try:
         updated_record = schema.load(history_data, instance=record, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
+    # Keep the denormalized current status in sync (for both students if the record moved)
+    for affected_student_id in {previous_student_id, updated_record.student_id}:
+        Student.query.get(affected_student_id).refresh_current_status()
     db.session.commit()
-    return schema.dump(updated_record), 200
+    return schema.dump_response(updated_record), 200
 
 @student_status_history_bp.route('/student-status-history/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -225,7 +252,9 @@ def delete_student_status_history(id):
     - 404: If record not found
     """
     record = StudentStatusHistory.query.get_or_404(id)
+    student = Student.query.get(record.student_id)
     db.session.delete(record)
+    student.refresh_current_status()
     db.session.commit()
     return '', 204
 
@@ -244,8 +273,10 @@ def get_student_status_history_record(record_id):
 
     Returns:
     - 200: JSON object of the student status history record (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If student status history record not found
     """
-    record = StudentStatusHistory.query.get_or_404(record_id)
-    schema = StudentStatusHistorySchema()
-    return schema.dump(record)
+    schema = StudentStatusHistorySchema.from_request()
+    check_not_modified(StudentStatusHistory.query.filter(StudentStatusHistory.id == record_id), schema)
+    record = StudentStatusHistory.query.options(*schema.eager_load_options()).get_or_404(record_id)
+    return schema.dump_response(record)
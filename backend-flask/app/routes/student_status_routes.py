@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.student_status_model import StudentStatus
 from app.schemas.schemas import StudentStatusSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 student_status_bp = Blueprint('student_status', __name__)
 
@@ -16,9 +16,11 @@ def get_student_statuses():
 
     Query Parameters:
     - name: str (optional) — Filter statuses by name (partial match).
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of statuses.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     name = request.args.get('name')
 
@@ -32,9 +34,10 @@ def get_student_statuses():
     # Order by name for consistent ordering
     query = query.order_by(StudentStatus.name)
 
-    statuses = query.all()
-    schema = StudentStatusSchema(many=True)
-    return schema.dump(statuses), 200
+    schema = StudentStatusSchema.from_request(many=True)
+    check_not_modified(query, schema)
+    statuses = query.options(*schema.eager_load_options()).all()
+    return schema.dump_response(statuses), 200
 
 #@student_status_bp.route('/student-statuses', methods=['POST'])
 @jwt_required()
@@ -67,7 +70,7 @@ def create_student_status():
     if not status_data.get("name"):
         return {"message": "name field is required"}, 400
 
-    schema = StudentStatusSchema()
+    schema = StudentStatusSchema.cached()
     try:
         status = schema.load(status_data)
     except Exception as e:
@@ -75,7 +78,7 @@ def create_student_status():
 
     db.session.add(status)
     db.session.commit()
-    return schema.dump(status), 201
+    return schema.dump_response(status), 201
 
 #@student_status_bp.route('/student-statuses/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -109,14 +112,14 @@ def update_student_status(id):
     
     status_data = data['student_status']
 
-    schema = StudentStatusSchema(partial=True)
+    schema = StudentStatusSchema.cached(partial=True)
     try:
         updated_status = schema.load(status_data, instance=status, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return schema.dump(updated_status), 200
+    return schema.dump_response(updated_status), 200
 
 #@student_status_bp.route('/student-statuses/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -155,8 +158,10 @@ def get_student_status(status_id):
 
     Returns:
     - 200: JSON object of the student status (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If student status not found
     """
-    status = StudentStatus.query.get_or_404(status_id)
-    schema = StudentStatusSchema()
-    return schema.dump(status)
+    schema = StudentStatusSchema.from_request()
+    check_not_modified(StudentStatus.query.filter(StudentStatus.id == status_id), schema)
+    status = StudentStatus.query.options(*schema.eager_load_options()).get_or_404(status_id)
+    return schema.dump_response(status)
@@ -4,7 +4,7 @@ from app.db import db
 from app.models.unit_model import Unit
 from app.models.level_model import Level
 from app.schemas.schemas import UnitSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 unit_bp = Blueprint('unit', __name__)
 
@@ -18,9 +18,11 @@ def get_units():
     Query Parameters:
     - name: str (optional) — Filter units by name (partial match).
     - level_id: int (optional) — Filter units by level ID.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of units.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     name = request.args.get('name')
     level_id = request.args.get('level_id', type=int)
@@ -39,9 +41,10 @@ def get_units():
     # Order by level_id, then by name for consistent ordering
     query = query.order_by(Unit.level_id, Unit.name)
 
-    units = query.all()
-    unit_schema = UnitSchema(many=True)
-    return unit_schema.dump(units), 200
+    unit_schema = UnitSchema.from_request(many=True)
+    check_not_modified(query, unit_schema)
+    units = query.options(*unit_schema.eager_load_options()).all()
+    return unit_schema.dump_response(units), 200
 
 @unit_bp.route('/units', methods=['POST'])
 @jwt_required()
@@ -85,7 +88,7 @@ def create_unit():
     if not level:
         return {"message": "Invalid level_id"}, 404
 
-    unit_schema = UnitSchema()
+    unit_schema = UnitSchema.cached()
     try:
         unit = unit_schema.load(unit_data)
     except Exception as e:
@@ -93,7 +96,7 @@ def create_unit():
 
     db.session.add(unit)
     db.session.commit()
-    return unit_schema.dump(unit), 201
+    return unit_schema.dump_response(unit), 201
 
 @unit_bp.route('/units/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -135,14 +138,14 @@ def update_unit(id):
         if not level:
             return {"message": "Invalid level_id"}, 404
 
-    unit_schema = UnitSchema(partial=True)
+    unit_schema = UnitSchema.cached(partial=True)
     try:
         updated_unit = unit_schema.load(unit_data, instance=unit, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return unit_schema.dump(updated_unit), 200
+    return unit_schema.dump_response(updated_unit), 200
 
 @unit_bp.route('/units/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -181,8 +184,10 @@ def get_unit(unit_id):
 
     Returns:
     - 200: JSON object of the unit (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If unit not found
     """
-    unit = Unit.query.get_or_404(unit_id)
-    unit_schema = UnitSchema()
-    return unit_schema.dump(unit)
\ No newline at end of file
+    unit_schema = UnitSchema.from_request()
+    check_not_modified(Unit.query.filter(Unit.id == unit_id), unit_schema)
+    unit = Unit.query.options(*unit_schema.eager_load_options()).get_or_404(unit_id)
+    return unit_schema.dump_response(unit)
\ No newline at end of file
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required
 from app.db import db
 from app.models.user_model import User
 from app.schemas.schemas import UserSchema
-from app.routes.utils import response_wrapper
+from app.routes.utils import response_wrapper, check_not_modified
 
 user_bp = Blueprint('user', __name__)
 
@@ -17,9 +17,11 @@ def get_users():
     Query Parameters:
     - email: str (optional) — Filter users by email (partial match).
     - role: str (optional) — Filter users by role.
+    - fields, include, depth: (optional) — Sparse fieldset selection, see BaseSchema.from_request.
 
     Returns:
     - 200: JSON array of users.
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     """
     email = request.args.get('email')
     role = request.args.get('role')
@@ -38,9 +40,10 @@ def get_users():
     # Order by email for consistent ordering
     query = query.order_by(User.email)
 
-    users = query.all()
-    schema = UserSchema(many=True)
-    return schema.dump(users), 200
+    schema = UserSchema.from_request(many=True)
+    check_not_modified(query, schema)
+    users = query.options(*schema.eager_load_options()).all()
+    return schema.dump_response(users), 200
 
 @user_bp.route('/users', methods=['POST'])
 @jwt_required()
@@ -84,7 +87,7 @@ def create_user():
     if existing_user:
         return {"message": "Email already exists"}, 400
 
-    schema = UserSchema()
+    schema = UserSchema.cached()
     try:
         user = schema.load(user_data)
     except Exception as e:
@@ -92,7 +95,7 @@ def create_user():
 
     db.session.add(user)
     db.session.commit()
-    return schema.dump(user), 201
+    return schema.dump_response(user), 201
 
 @user_bp.route('/users/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -137,14 +140,14 @@ def update_user(id):
         if existing_user:
             return {"message": "Email already exists"}, 400
 
-    schema = UserSchema(partial=True)
+    schema = UserSchema.cached(partial=True)
     try:
         updated_user = schema.load(user_data, instance=user, partial=True)
     except Exception as e:
         return {"message": str(e)}, 400
 
     db.session.commit()
-    return schema.dump(updated_user), 200
+    return schema.dump_response(updated_user), 200
 
 @user_bp.route('/users/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -183,8 +186,10 @@ def get_user(user_id):
 
     Returns:
     - 200: JSON object of the user (marshmallow schema)
+    - 304: If the client's cached copy (If-None-Match / If-Modified-Since) is still current
     - 404: If user not found
     """
-    user = User.query.get_or_404(user_id)
-    schema = UserSchema()
-    return schema.dump(user)
+    schema = UserSchema.from_request()
+    check_not_modified(User.query.filter(User.id == user_id), schema)
+    user = User.query.options(*schema.eager_load_options()).get_or_404(user_id)
+    return schema.dump_response(user)
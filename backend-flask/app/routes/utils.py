@@ -1,11 +1,31 @@
-from flask import jsonify, make_response
+from flask import Response, current_app, g, jsonify, make_response, request, stream_with_context
+from sqlalchemy import BigInteger, and_, or_, cast, func, literal, select, union_all
+from sqlalchemy.orm import aliased
+from flask_sqlalchemy.record_queries import get_recorded_queries
 from functools import wraps
+from itertools import islice
+from datetime import datetime, timezone
+import base64
+import hashlib
+import json
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import is_resource_modified
+from app.db import db
+
+# Rows fetched and serialized at a time by stream_ndjson
+NDJSON_BATCH_SIZE = 500
+
+class NotModified(Exception):
+    """Raised by check_not_modified when the client's cached copy is current."""
 
 def response_wrapper(func):
     @wraps(func)
     def wrapped_function(*args, **kwargs):
         try:
             result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                # Already a complete response (e.g. a stream_ndjson stream)
+                return result
             if isinstance(result, tuple) and len(result) == 2:
                 data, status_code = result
             else:
@@ -21,17 +41,29 @@ def response_wrapper(func):
                 }
                 return make_response(jsonify(response), 204)
 
+            # Returned 4xx/5xx results (validation messages, bulk per-item errors) are errors like abort()'s
+            status = "success" if status_code < 400 else "error"
             if isinstance(data, dict) and "message" in data:
                 response = {
-                    "status": "success",
+                    "status": status,
                     "message": data["message"]
                 }
             else:
                 response = {
-                    "status": "success",
+                    "status": status,
                     "data": data
                 }
             return jsonify(response), status_code
+        except NotModified:
+            # Empty 304; the validators are added by add_conditional_headers
+            return make_response('', 304)
+        except HTTPException as e:
+            # abort() / get_or_404() inside a route keep their status code
+            response = {
+                "status": "error",
+                "message": e.description
+            }
+            return jsonify(response), e.code
         except Exception as e:
             response = {
                 "status": "error",
@@ -39,3 +71,257 @@ def response_wrapper(func):
             }
             return jsonify(response), 500
     return wrapped_function
+
+def add_query_count_header(response):
+    """
+    Report how many SQL statements the request ran in an X-Query-Count header.
+    Only active when SQLALCHEMY_RECORD_QUERIES is enabled (on by default in debug mode).
+    """
+    if current_app.config.get('SQLALCHEMY_RECORD_QUERIES'):
+        response.headers['X-Query-Count'] = str(len(get_recorded_queries()))
+    return response
+
+def check_not_modified(query, schema, page_state=None):
+    """
+    Answer a conditional GET (If-None-Match / If-Modified-Since) before anything is loaded or serialized.
+
+    query is the filtered query of the resource(s) being returned (a single-row query for one resource)
+    and schema the schema it is dumped with. The validators are built from the request path and query
+    string and a stamp of every version node of the schema (see BaseSchema.version_nodes and stamp_rows):
+    the rows of the query and the rows related to them through the relationships the schema dumps.
+
+    For a paginated response, query is the ordered and limited query of the page's rows and page_state a
+    callable returning the rest of what the page shows (e.g. whether there is a next page, the total), as
+    the paginator records it (see keyset_paginate and offset_paginate).
+
+    Without conditional headers nothing is queried here: the validators sent with the response are
+    stamped from the rows the route dumps (see BaseSchema.dump_response). With them, the same stamps are
+    computed in one statement scoped to the query's rows, and NotModified is raised, answered with an
+    empty 304 by response_wrapper, when the client's copy is current. Schemas that dump rows without
+    updated_date get no validators; see check_content_not_modified for those.
+    """
+    if schema.version_nodes() is None:
+        return
+    if not request.if_none_match and request.if_modified_since is None:
+        g.conditional_schema = schema
+        return
+
+    validators = _conditional_validators(
+        _query_stamps(query, schema, paged=page_state is not None),
+        page_state() if page_state is not None else None
+    )
+    g.conditional_validators = validators
+    etag, last_modified = validators
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        raise NotModified()
+
+def _query_stamps(query, schema, paged=False):
+    # One (node, count, id sum, parent * id sum, latest updated_date) row per version node, each node's
+    # rows selected from its parent node's rows through the relationship (see stamp_rows)
+    model = schema.opts.model
+    nodes = schema.version_nodes()
+    if paged:
+        # Keep the page's ORDER BY and LIMIT; DISTINCT goes outside, where it cannot change which rows are on it
+        page = query.with_entities(model.id.label('child_id'), model.updated_date.label('updated_date')).subquery()
+        root = select(literal(0).label('parent_id'), page.c.child_id, page.c.updated_date)
+    else:
+        root = query.order_by(None).with_entities(
+            literal(0).label('parent_id'), model.id.label('child_id'), model.updated_date.label('updated_date')
+        )
+    levels = [root.distinct().cte('version_0')]
+    for index, (parent_index, relationship) in enumerate(nodes[1:], start=1):
+        parent = aliased(relationship.parent.class_)
+        child = aliased(relationship.mapper.class_)
+        levels.append(
+            select(
+                parent.id.label('parent_id'), child.id.label('child_id'), child.updated_date.label('updated_date')
+            ).join(
+                getattr(parent, relationship.key).of_type(child)
+            ).where(
+                parent.id.in_(select(levels[parent_index].c.child_id))
+            ).distinct().cte(f'version_{index}')
+        )
+
+    stamps = union_all(*[
+        select(
+            literal(index).label('node'),
+            func.count(),
+            func.coalesce(func.sum(level.c.child_id), 0),
+            func.coalesce(func.sum(cast(level.c.parent_id, BigInteger) * level.c.child_id), 0),
+            func.max(level.c.updated_date)
+        )
+        for index, level in enumerate(levels)
+    ])
+    rows = sorted(db.session.execute(stamps).all())
+    # Sums come back as Decimal from PostgreSQL
+    return [(count, int(child_sum), int(pair_sum), updated_date) for _, count, child_sum, pair_sum, updated_date in rows]
+
+def record_conditional_stamps(schema, stamps, page_state=None):
+    """
+    Send the validators of an unconditional GET for schema (see check_not_modified), stamped from the rows
+    the route loaded. stamps must match schema.version_nodes() (see BaseSchema.row_stamps) and page_state
+    what check_not_modified's page_state returns for the same page.
+    """
+    if g.get('conditional_schema') is schema:
+        g.conditional_schema = None
+        g.conditional_validators = _conditional_validators(stamps, page_state)
+
+def check_content_not_modified(data):
+    """
+    Answer a conditional GET from the response data itself, for responses built from rows that cannot be
+    versioned (see check_not_modified) or from several queries. The ETag is a hash of data, so everything
+    is still loaded and dumped, but an unchanged response is sent as an empty 304.
+    """
+    etag = hashlib.sha1(current_app.json.dumps(data).encode()).hexdigest()[:32]
+    g.conditional_validators = (etag, None)
+    if not is_resource_modified(request.environ, etag=etag):
+        raise NotModified()
+
+def _conditional_validators(stamps, page_state=None):
+    digest = hashlib.sha1(repr((request.full_path, stamps, page_state)).encode()).hexdigest()
+    timestamps = [stamp[3] for stamp in stamps if stamp[3] is not None]
+    # Stored timestamps are naive UTC; HTTP dates have whole-second precision
+    last_modified = max(timestamps).replace(tzinfo=timezone.utc, microsecond=0) if timestamps else None
+    return digest[:32], last_modified
+
+def add_conditional_headers(response):
+    """
+    Send the validators of a conditional GET (see check_not_modified) with 200 and 304 responses.
+    Cache-Control makes browsers revalidate on every use instead of serving stale lists.
+    """
+    validators = g.get('conditional_validators')
+    if validators is not None and response.status_code in (200, 304):
+        etag, last_modified = validators
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def stream_ndjson(query, schema, batch_size=NDJSON_BATCH_SIZE):
+    """
+    Stream a query as newline-delimited JSON (application/x-ndjson), one dumped object per line.
+
+    Rows are fetched with yield_per and serialized one batch at a time, so memory use stays flat however
+    many rows match. schema must be a many=True schema. The status code is sent before the first row, so
+    an error mid-stream ends the body with a {"status": "error", "message": ...} line instead.
+    """
+    json_provider = current_app.json
+    # A stream is dumped batch by batch after the headers are sent, so it carries no validators
+    g.pop('conditional_schema', None)
+
+    def generate():
+        rows = iter(query.yield_per(batch_size))
+        try:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                yield ''.join(json_provider.dumps(item) + '\n' for item in schema.dump_response(batch))
+        except Exception as e:
+            current_app.logger.exception("NDJSON stream failed")
+            yield json_provider.dumps({"status": "error", "message": str(e)}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque, URL-safe cursor."""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        if python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError) as e:
+                raise ValueError("Invalid cursor") from e
+        elif not isinstance(value, python_type) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+def keyset_paginate(query, columns, cursor, per_page, with_total=False, descending=True, schema=None):
+    """
+    Paginate a query by seeking past the last row seen instead of using OFFSET.
+
+    columns is the sort key, most significant first; the last column must be unique (usually the id).
+    An empty cursor returns the first page. Unlike offset_paginate(), no COUNT(*) is issued unless
+    with_total is set. With schema (the schema the items are dumped with), a conditional GET is answered
+    for this page first (see check_not_modified) and what schema dumps is eager-loaded.
+
+    Returns (items, pagination) where pagination holds per_page, next_cursor (None on the last page)
+    and, if requested, total. Raises ValueError for a malformed cursor.
+    """
+    total = query.order_by(None).count() if with_total else None
+
+    page = query.order_by(None).order_by(*[column.desc() if descending else column.asc() for column in columns])
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # Expanded (a < x) OR (a = x AND b < y) form of the row comparison so indexes on the sort key apply
+        conditions = []
+        for i, column in enumerate(columns):
+            seek = column < values[i] if descending else column > values[i]
+            conditions.append(and_(*[columns[j] == values[j] for j in range(i)], seek))
+        page = page.filter(or_(*conditions))
+
+    if schema is not None:
+        check_not_modified(
+            page.limit(per_page), schema,
+            lambda: (db.session.query(page.offset(per_page).limit(1).exists()).scalar(), total)
+        )
+        page = page.options(*schema.eager_load_options())
+
+    # Fetch one extra row to find out whether there is a next page
+    items = page.limit(per_page + 1).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    if schema is not None:
+        record_conditional_stamps(schema, schema.row_stamps(items), (has_next, total))
+
+    pagination = {
+        "per_page": per_page,
+        "next_cursor": encode_cursor([getattr(items[-1], column.key) for column in columns]) if has_next else None
+    }
+    if with_total:
+        pagination["total"] = total
+    return items, pagination
+
+def offset_paginate(query, page, per_page, schema=None):
+    """
+    Paginate an ordered query with LIMIT/OFFSET. A page or per_page below 1 is taken as 1 and 20, and a
+    page past the end is empty, as with Flask-SQLAlchemy's paginate(error_out=False). With schema (the
+    schema the items are dumped with), a conditional GET is answered for this page first (see
+    check_not_modified) and what schema dumps is eager-loaded.
+
+    Returns (items, pagination) where pagination holds page, pages, per_page and total.
+    """
+    page = page if page >= 1 else 1
+    per_page = per_page if per_page >= 1 else 20
+    total = query.order_by(None).count()
+
+    rows = query.limit(per_page).offset((page - 1) * per_page)
+    if schema is not None:
+        check_not_modified(rows, schema, lambda: total)
+        rows = rows.options(*schema.eager_load_options())
+
+    items = rows.all()
+    if schema is not None:
+        record_conditional_stamps(schema, schema.row_stamps(items), total)
+
+    return items, {
+        "page": page,
+        "pages": -(-total // per_page),
+        "per_page": per_page,
+        "total": total
+    }
@@ -1,15 +1,47 @@
-from marshmallow import post_dump, EXCLUDE, fields
+from flask import abort, g, request
+from marshmallow import EXCLUDE, Schema, fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
 from marshmallow_sqlalchemy.fields import Nested
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from app.db import db
-import re
+from app.profiling import serialization_timer
+from app.routes.utils import record_conditional_stamps
+from datetime import datetime, timezone
+from functools import lru_cache
+import threading
 
-ISO_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+# Safety net against self-referencing schemas; the nested excludes in schemas.py keep real trees shallower
+MAX_EAGER_LOAD_DEPTH = 4
+
+# Upper bound on cached schema variants; every distinct sparse fieldset requested adds one
+SCHEMA_CACHE_SIZE = 512
+
+def utc_isoformat(value):
+    """
+    ISO 8601 in UTC with a 'Z' suffix, the format of every datetime the API returns.
+    Naive values (as stored by the database) are taken to be UTC already.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + 'Z'
+
+class UTCDateTime(fields.DateTime):
+    """
+    DateTime field that dumps ISO 8601 in UTC with a 'Z' suffix (see utc_isoformat).
+    """
+    def _serialize(self, value, attr, obj, **kwargs):
+        return utc_isoformat(value)
 
 class BaseSchema(SQLAlchemyAutoSchema):
+    # DateTime columns are generated as UTCDateTime fields
+    TYPE_MAPPING = {**Schema.TYPE_MAPPING, datetime: UTCDateTime}
+
     id = fields.Integer(dump_only=True)
-    created_date = fields.DateTime(dump_only=True)
-    updated_date = fields.DateTime(dump_only=True)
+    created_date = UTCDateTime(dump_only=True)
+    updated_date = UTCDateTime(dump_only=True)
     class Meta:
         abstract = True
         unknown = EXCLUDE
@@ -17,14 +49,251 @@ class BaseSchema(SQLAlchemyAutoSchema):
         load_instance = True
         include_relationships = True
 
-    @post_dump
-    def add_utc_suffix(self, data, **kwargs):
-        # Add 'Z' to all datetime fields that are present and not already suffixed
-        for key, value in data.items():
-            if (
-                isinstance(value, str)
-                and ISO_DATETIME_RE.match(value)
-                and not value.endswith('Z')
-            ):
-                data[key] = value + 'Z'
-        return data
\ No newline at end of file
+    # load(instance=...) keeps the instance being updated on the schema while it runs; keep it per
+    # thread so cached schemas can be shared by concurrent requests
+    @property
+    def instance(self):
+        return getattr(self._thread_state(), 'instance', None)
+
+    @instance.setter
+    def instance(self, value):
+        self._thread_state().instance = value
+
+    def _thread_state(self):
+        return self.__dict__.setdefault('_thread_local', threading.local())
+
+    def dump_response(self, obj):
+        """
+        Dump obj for a response body. Routes call this instead of dump(), which nested fields also call for
+        every related object, so the per-response work happens once: the dump is counted as serialization
+        time when request profiling is on (see app.profiling), and an unconditional GET for this schema
+        (see check_not_modified) gets its validators from the objects dumped.
+        """
+        if g.get('conditional_schema') is self:
+            record_conditional_stamps(self, self.row_stamps(obj if self.many else [obj]))
+        with serialization_timer():
+            return self.dump(obj)
+
+    @classmethod
+    def cached(cls, many=False, partial=False, only=None, exclude=()):
+        """
+        Return the shared instance of this schema for the given options, built on first use.
+        Safe to use from concurrent requests for dump() and load(); never modify its attributes.
+        Raises ValueError if only/exclude name unknown fields.
+        """
+        return _cached_schema(
+            cls,
+            many,
+            partial,
+            tuple(only) if only is not None else None,
+            tuple(exclude)
+        )
+
+    @classmethod
+    def from_request(cls, **kwargs):
+        """
+        Build a schema that honours the sparse fieldset query parameters of the current request.
+
+        Query Parameters:
+        - fields: str (optional) — Comma-separated fields to return, dotted for nested fields (e.g. id,datetime,students.first_name).
+        - include: str (optional) — Comma-separated nested relationships to expand (dotted for deeper levels); others are omitted.
+        - depth: int (optional) — How many levels of nested objects to expand (0 returns none).
+
+        fields takes priority over include/depth. Without any of them the full schema is used.
+        Aborts with 400 if a parameter names an unknown field or depth is not a non-negative integer.
+        """
+        selected_fields = _split_arg(request.args.get('fields'))
+        include = _split_arg(request.args.get('include'))
+        depth = request.args.get('depth')
+
+        if depth is not None:
+            if not depth.isdigit():
+                abort(400, description="depth must be a non-negative integer")
+            depth = int(depth)
+
+        try:
+            if selected_fields:
+                kwargs['only'] = selected_fields
+            elif include or depth is not None:
+                full_schema = cls.cached(many=kwargs.get('many', False))
+                kwargs['only'] = _field_paths(
+                    full_schema,
+                    MAX_EAGER_LOAD_DEPTH if depth is None else depth,
+                    include or None,
+                    ''
+                )
+            schema = cls.cached(**kwargs)
+        except ValueError as e:
+            abort(400, description=str(e))
+        return schema
+
+    def eager_load_options(self):
+        """
+        Build SQLAlchemy loader options for every relationship this schema dumps.
+
+        Collections are loaded with selectinload (one extra query per relationship),
+        many-to-one relationships with joinedload. When the schema is restricted with
+        only=, the loaded columns are restricted to match.
+        Usage: query.options(*schema.eager_load_options())
+        """
+        # Computed once per schema instance; loader options are immutable and can be reused
+        options = self.__dict__.get('_eager_load_options')
+        if options is None:
+            options = []
+            if self.only:
+                options.append(load_only(*_dumped_columns(self)))
+            options += _loader_options(self, None, MAX_EAGER_LOAD_DEPTH)
+            self.__dict__['_eager_load_options'] = options
+        return options
+
+    def version_nodes(self):
+        """
+        The rows a dump of this schema covers, as (parent_index, relationship) nodes: the dumped rows
+        themselves (index 0, no parent) and the targets of every relationship it dumps, followed to the
+        same depth as eager_load_options(). Used to version responses for conditional GETs.
+        Returns None if any of these models has no updated_date, as such rows cannot be versioned.
+        """
+        nodes = self.__dict__.get('_version_nodes', False)
+        if nodes is False:
+            nodes = [(None, None)]
+            _collect_version_nodes(self, 0, MAX_EAGER_LOAD_DEPTH, nodes)
+            models = [self.opts.model] + [relationship.mapper.class_ for _, relationship in nodes[1:]]
+            if not all('updated_date' in sa_inspect(model).column_attrs for model in models):
+                nodes = None
+            self.__dict__['_version_nodes'] = nodes
+        return nodes
+
+    def row_stamps(self, objects):
+        """
+        Version stamps (see stamp_rows) of the given loaded objects and the related objects this schema
+        dumps with them, one per version node. Reads only what eager_load_options() loads.
+        """
+        nodes = self.version_nodes()
+        if nodes is None:
+            return None
+        levels = [{obj.id: obj for obj in objects}]
+        stamps = [stamp_rows((0, obj.id, obj.updated_date) for obj in levels[0].values())]
+        for parent_index, relationship in nodes[1:]:
+            children = {}
+            pairs = []
+            for parent in levels[parent_index].values():
+                value = getattr(parent, relationship.key)
+                for child in (value if relationship.uselist else [value] if value is not None else []):
+                    children[child.id] = child
+                    pairs.append((parent.id, child.id, child.updated_date))
+            levels.append(children)
+            stamps.append(stamp_rows(pairs))
+        return stamps
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _cached_schema(cls, many, partial, only, exclude):
+    schema = cls(many=many, partial=partial, only=only, exclude=exclude)
+    # Nested selections are only checked when the nested schema is built
+    _resolve_nested(schema)
+    return schema
+
+def warm_schema_cache():
+    """
+    Build the common variants of every schema, their nested schemas and loader options
+    ahead of the first request.
+    """
+    for schema_cls in BaseSchema.__subclasses__():
+        schema_cls.cached().eager_load_options()
+        schema_cls.cached(many=True).eager_load_options()
+        schema_cls.cached(partial=True)
+
+def _split_arg(value):
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def _field_paths(schema, depth, include, prefix):
+    # Expand a schema into dotted field paths, following nested fields up to depth
+    # (and, if include is given, only the nested paths it names or leads to)
+    paths = []
+    for name, field in schema.dump_fields.items():
+        path = prefix + name
+        if not isinstance(field, fields.Nested):
+            paths.append(path)
+            continue
+        if depth <= 0:
+            continue
+        if include is not None and not any(item == path or item.startswith(path + '.') for item in include):
+            continue
+        paths.extend(_field_paths(field.schema, depth - 1, include, path + '.'))
+    return paths
+
+def _resolve_nested(schema):
+    # Only nested fields narrowed by a dotted selection need checking; following the
+    # others would walk the (cyclic) schema graph indefinitely
+    for field in schema.dump_fields.values():
+        if isinstance(field, fields.Nested) and field.only:
+            _resolve_nested(field.schema)
+
+def _dumped_columns(schema):
+    mapper = sa_inspect(schema.opts.model)
+    keys = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+    # Always loaded: the validators of conditional GETs are built from it (see row_stamps)
+    if 'updated_date' in mapper.column_attrs:
+        keys.append('updated_date')
+    for name, field in schema.dump_fields.items():
+        key = field.attribute or name
+        if key in mapper.column_attrs and key not in keys:
+            keys.append(key)
+    return [mapper.column_attrs[key].class_attribute for key in keys]
+
+def _loader_options(schema, parent, depth):
+    model = schema.opts.model
+    relationships = sa_inspect(model).relationships
+    options = []
+
+    for name, field in schema.dump_fields.items():
+        if not isinstance(field, fields.Nested):
+            continue
+        # Nested fields without a backing relationship dump nothing and need no loading
+        relationship = relationships.get(field.attribute or name)
+        if relationship is None:
+            continue
+
+        attr = getattr(model, relationship.key)
+        if parent is None:
+            loader = selectinload(attr) if relationship.uselist else joinedload(attr)
+        else:
+            loader = parent.selectinload(attr) if relationship.uselist else parent.joinedload(attr)
+        options.append(loader)
+        if field.schema.only:
+            options.append(loader.load_only(*_dumped_columns(field.schema)))
+
+        if depth > 1:
+            options.extend(_loader_options(field.schema, loader, depth - 1))
+    return options
+
+def _collect_version_nodes(schema, parent_index, depth, nodes):
+    # Follows the same nested fields as _loader_options, so the walk in row_stamps never lazy-loads
+    relationships = sa_inspect(schema.opts.model).relationships
+    for name, field in schema.dump_fields.items():
+        if not isinstance(field, fields.Nested):
+            continue
+        relationship = relationships.get(field.attribute or name)
+        if relationship is None:
+            continue
+        nodes.append((parent_index, relationship))
+        if depth > 1:
+            _collect_version_nodes(field.schema, len(nodes) - 1, depth - 1, nodes)
+
+def stamp_rows(rows):
+    """
+    Version stamp of the rows of one version node, from (parent_id, child_id, updated_date) tuples:
+    the number of distinct (parent, child) pairs, the sum of the child ids, the sum of parent_id * child_id
+    and the latest updated_date. Adding, removing or moving a row changes the first three; editing it
+    changes the last. check_not_modified computes the same stamps in SQL.
+    """
+    pairs = {}
+    for parent_id, child_id, updated_date in rows:
+        pairs[(parent_id, child_id)] = updated_date
+    return (
+        len(pairs),
+        sum(child_id for _, child_id in pairs),
+        sum(parent_id * child_id for parent_id, child_id in pairs),
+        max(pairs.values(), default=None)
+    )
@@ -1,4 +1,4 @@
-from app.schemas.base_schema import BaseSchema
+from app.schemas.base_schema import BaseSchema, UTCDateTime
 from app.models.student_model import Student
 from app.models.lesson_student_model import LessonStudent
 from app.models.student_status_model import StudentStatus 
@@ -18,9 +18,15 @@ from marshmallow_sqlalchemy.fields import Nested
 class StudentSchema(BaseSchema):
     # Nested relationships - avoiding circular references with dump_only
     lessons = Nested('LessonSchema', many=True, dump_only=True, exclude=['students'])
-    status_history = Nested('StudentStatusHistorySchema', many=True, dump_only=True)
-    level_history = Nested('StudentLevelHistorySchema', many=True, dump_only=True)
+    status_history = Nested('StudentStatusHistorySchema', many=True, dump_only=True, exclude=['status'])
+    level_history = Nested('StudentLevelHistorySchema', many=True, dump_only=True, exclude=['level'])
     quizzes = Nested('StudentLessonQuizSchema', many=True, dump_only=True)
+
+    # Maintained from the status/level history records, never set directly
+    current_status_id = fields.Integer(dump_only=True)
+    current_status_changed_at = UTCDateTime(dump_only=True)
+    current_level_id = fields.Integer(dump_only=True)
+    current_level_start_date = UTCDateTime(dump_only=True)
     
     class Meta(BaseSchema.Meta):
         model = Student
@@ -49,7 +55,7 @@ class StudentStatusHistorySchema(BaseSchema):
     # Keep the foreign key fields for loading/creation
     student_id = fields.Integer(required=True, allow_none=False)
     status_id = fields.Integer(required=True, allow_none=False)
-    changed_at = fields.DateTime(required=True, allow_none=False)
+    changed_at = UTCDateTime(required=True, allow_none=False)
     
     class Meta(BaseSchema.Meta):
         model = StudentStatusHistory
@@ -58,6 +64,9 @@ class StudentStatusHistorySchema(BaseSchema):
 class LessonSchema(BaseSchema):
     # Nested relationships - avoiding circular references with dump_only
     students = Nested('StudentSchema', many=True, dump_only=True, exclude=['lessons'])
+
+    # Maintained from the lesson_student links, never set directly
+    student_count = fields.Integer(dump_only=True)
     
     class Meta(BaseSchema.Meta):
         model = Lesson
@@ -89,12 +98,12 @@ class UnitSchema(BaseSchema):
 class StudentLevelHistorySchema(BaseSchema):
     # Nested relationships to show full objects
     student = Nested('StudentSchema', dump_only=True, exclude=['level_history', 'lessons'])
-    level = Nested('LevelSchema', dump_only=True)
+    level = Nested('LevelSchema', dump_only=True, exclude=['student_level_history', 'units'])
     
     # Keep the foreign key fields for loading/creation
     student_id = fields.Integer(required=True, allow_none=False)
     level_id = fields.Integer(required=True, allow_none=False)
-    start_date = fields.DateTime(required=True, allow_none=False)
+    start_date = UTCDateTime(required=True, allow_none=False)
     
     class Meta(BaseSchema.Meta):
         model = StudentLevelHistory
@@ -1,35 +1,58 @@
-import time
+import os
 import sys
-from flask_migrate import upgrade
-from app.main import app, db
-from app.data.initialize_data import create_all_data
+from app.main import create_app
+from app.db import db, wait_for_database
 
 if __name__ == '__main__':
-    # Wait for the database to be ready
-    time.sleep(5)
-
     load_init = '--load-init' in sys.argv or '-i' in sys.argv
     load_demo = '--load-demo' in sys.argv or '-d' in sys.argv
+    production = '--production' in sys.argv or '-p' in sys.argv
+
+    app = create_app()
+    timer = app.extensions['startup_timer']
+    timer.mark('create_app')
+
+    # Wait for the database to accept connections (retries with backoff, see DB_READY_TIMEOUT)
+    try:
+        waited = wait_for_database(app)
+        print(f"Database ready after {waited:.1f}s")
+    except Exception as e:
+        print(f"Database not ready: {e}")
+    timer.mark('database ready')
 
     with app.app_context():
+        from flask_migrate import upgrade
+
         # Run database migrations automatically
         try:
             upgrade()
             print("Database migrations applied successfully")
         except Exception as e:
             print(f"Migration failed: {e}")
-        
+        timer.mark('migrations')
+
         # Always ensure tables exist (safe for both fresh and existing databases)
         try:
             db.create_all()
             print("Database tables verified/created successfully")
         except Exception as e:
             print(f"Table creation failed: {e}")
-        
+        timer.mark('create_all')
+
         if load_init:
+            from app.data.initialize_data import create_all_data
             create_all_data()
+            timer.mark('initial data')
         #if load_demo:
             #load_demo_data()
 
-    # Start the Flask application
-    app.run(host='0.0.0.0', port=4000)
\ No newline at end of file
+    print(timer.summary())
+
+    if production:
+        # Replace this process with gunicorn so it receives container signals directly
+        # (SIGHUP reloads workers gracefully, SIGTERM drains in-flight requests). See gunicorn.conf.py.
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+        os.execvp('gunicorn', ['gunicorn', '--config', config, 'app.main:create_app()'])
+
+    # Start the Flask development server
+    app.run(host='0.0.0.0', port=4000)
@@ -0,0 +1,48 @@
+# Gunicorn settings for the production server (python entrypoint.py --production).
+# Every setting can be overridden with the environment variable next to it.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:4000")
+# Resolve app.main:create_app() relative to this directory regardless of where gunicorn is started
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+# Threaded workers: a small box gets a few processes, each serving several requests concurrently
+workers = int(os.environ.get("GUNICORN_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Requests taking longer than this are aborted and the worker restarted
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# Time given to in-flight requests on reload (SIGHUP) or shutdown (SIGTERM)
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers periodically to bound memory growth; jitter avoids restarting them all at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Prometheus metrics (app/metrics.py) are aggregated across workers through files in this directory
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus-multiproc"))
+
+
+def on_starting(server):
+    # Start from empty metrics on every (re)start of the master
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (in-flight requests, pool usage) of a worker that exited
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
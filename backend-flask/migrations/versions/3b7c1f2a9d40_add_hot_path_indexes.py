@@ -0,0 +1,61 @@
+"""Add indexes for hot filter and join paths
+
+Revision ID: 3b7c1f2a9d40
+Revises: e5f54bdd91a1
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1f2a9d40'
+down_revision = 'e5f54bdd91a1'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ('ix_lesson_datetime', 'lesson', ['datetime'], False),
+    ('uq_lesson_student_lesson_id_student_id', 'lesson_student', ['lesson_id', 'student_id'], True),
+    ('ix_lesson_student_student_id_lesson_id', 'lesson_student', ['student_id', 'lesson_id'], False),
+    ('ix_student_status_history_student_id_changed_at', 'student_status_history', ['student_id', 'changed_at'], False),
+    ('ix_student_level_history_student_id_start_date', 'student_level_history', ['student_id', 'start_date'], False),
+    ('ix_student_lesson_quiz_student_id', 'student_lesson_quiz', ['student_id'], False),
+    ('ix_student_lesson_quiz_lesson_id', 'student_lesson_quiz', ['lesson_id'], False),
+    ('ix_student_lesson_quiz_quiz_id', 'student_lesson_quiz', ['quiz_id'], False),
+]
+
+
+def _existing_indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    # Tables are created by db.create_all() on a fresh database, which already
+    # includes these indexes, so only touch tables that exist without them.
+    if 'lesson_student' in tables:
+        # Drop duplicate assignments (keeping the oldest) so the unique index can be built
+        op.execute(
+            "DELETE FROM lesson_student WHERE id NOT IN ("
+            "SELECT MIN(id) FROM lesson_student GROUP BY lesson_id, student_id)"
+        )
+
+    for name, table, columns, unique in INDEXES:
+        if table not in tables or name in _existing_indexes(inspector, table):
+            continue
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns, unique in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""Add indexes for keyset pagination sort keys
+
+Revision ID: 8d2e4a6c1b95
+Revises: 3b7c1f2a9d40
+Create Date: 2026-10-18 11:03:27.518340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4a6c1b95'
+down_revision = '3b7c1f2a9d40'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ('ix_student_status_history_changed_at_id', 'student_status_history', ['changed_at', 'id'], False),
+    ('ix_student_level_history_start_date_id', 'student_level_history', ['start_date', 'id'], False),
+    ('ix_student_lesson_quiz_created_date_id', 'student_lesson_quiz', ['created_date', 'id'], False),
+]
+
+
+def _existing_indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns, unique in INDEXES:
+        if table not in tables or name in _existing_indexes(inspector, table):
+            continue
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns, unique in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
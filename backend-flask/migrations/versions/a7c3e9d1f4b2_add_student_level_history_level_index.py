@@ -0,0 +1,38 @@
+"""Add an index on student_level_history.level_id
+
+Revision ID: a7c3e9d1f4b2
+Revises: f2a8c5d7e631
+Create Date: 2026-10-18 18:47:09.613274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9d1f4b2'
+down_revision = 'f2a8c5d7e631'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # Fresh databases get the index from db.create_all()
+    if 'student_level_history' not in inspector.get_table_names():
+        return
+    if 'ix_student_level_history_level_id' in {index['name'] for index in inspector.get_indexes('student_level_history')}:
+        return
+
+    # Levels dump their history through this foreign key, and conditional GETs version it the same way
+    op.create_index('ix_student_level_history_level_id', 'student_level_history', ['level_id'])
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'student_level_history' not in inspector.get_table_names():
+        return
+    if 'ix_student_level_history_level_id' not in {index['name'] for index in inspector.get_indexes('student_level_history')}:
+        return
+
+    op.drop_index('ix_student_level_history_level_id', table_name='student_level_history')
@@ -0,0 +1,43 @@
+"""Add updated_date to student_status
+
+Revision ID: b5d1f8e2c374
+Revises: a7c3e9d1f4b2
+Create Date: 2026-10-18 21:12:40.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d1f8e2c374'
+down_revision = 'a7c3e9d1f4b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # Fresh databases get the column from db.create_all()
+    if 'student_status' not in inspector.get_table_names():
+        return
+    if 'updated_date' in {column['name'] for column in inspector.get_columns('student_status')}:
+        return
+
+    # Added nullable and backfilled first: SQLite cannot add a NOT NULL column without a constant default
+    with op.batch_alter_table('student_status') as batch_op:
+        batch_op.add_column(sa.Column('updated_date', sa.DateTime(), nullable=True))
+    op.execute("UPDATE student_status SET updated_date = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('student_status') as batch_op:
+        batch_op.alter_column('updated_date', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'student_status' not in inspector.get_table_names():
+        return
+    if 'updated_date' not in {column['name'] for column in inspector.get_columns('student_status')}:
+        return
+
+    with op.batch_alter_table('student_status') as batch_op:
+        batch_op.drop_column('updated_date')
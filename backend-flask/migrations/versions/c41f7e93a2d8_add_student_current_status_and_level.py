@@ -0,0 +1,80 @@
+"""Add denormalized current status and level to student
+
+Revision ID: c41f7e93a2d8
+Revises: 8d2e4a6c1b95
+Create Date: 2026-10-18 13:47:05.661902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7e93a2d8'
+down_revision = '8d2e4a6c1b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # Fresh databases get the columns from db.create_all()
+    if 'student' not in inspector.get_table_names():
+        return
+    if 'current_status_id' in {column['name'] for column in inspector.get_columns('student')}:
+        return
+
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.add_column(sa.Column('current_status_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('current_status_changed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('current_level_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('current_level_start_date', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_student_current_status_id_student_status', 'student_status',
+            ['current_status_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_foreign_key(
+            'fk_student_current_level_id_level', 'level',
+            ['current_level_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index('ix_student_current_status_id', ['current_status_id'])
+        batch_op.create_index('ix_student_current_level_id', ['current_level_id'])
+
+    # Backfill from the latest history record of each student
+    op.execute("""
+        UPDATE student SET
+            current_status_id = (
+                SELECT status_id FROM student_status_history h WHERE h.student_id = student.id
+                ORDER BY h.changed_at DESC, h.id DESC LIMIT 1
+            ),
+            current_status_changed_at = (
+                SELECT changed_at FROM student_status_history h WHERE h.student_id = student.id
+                ORDER BY h.changed_at DESC, h.id DESC LIMIT 1
+            ),
+            current_level_id = (
+                SELECT level_id FROM student_level_history h WHERE h.student_id = student.id
+                ORDER BY h.start_date DESC, h.id DESC LIMIT 1
+            ),
+            current_level_start_date = (
+                SELECT start_date FROM student_level_history h WHERE h.student_id = student.id
+                ORDER BY h.start_date DESC, h.id DESC LIMIT 1
+            )
+    """)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'student' not in inspector.get_table_names():
+        return
+    if 'current_status_id' not in {column['name'] for column in inspector.get_columns('student')}:
+        return
+
+    with op.batch_alter_table('student') as batch_op:
+        batch_op.drop_index('ix_student_current_level_id')
+        batch_op.drop_index('ix_student_current_status_id')
+        batch_op.drop_constraint('fk_student_current_level_id_level', type_='foreignkey')
+        batch_op.drop_constraint('fk_student_current_status_id_student_status', type_='foreignkey')
+        batch_op.drop_column('current_level_start_date')
+        batch_op.drop_column('current_level_id')
+        batch_op.drop_column('current_status_changed_at')
+        batch_op.drop_column('current_status_id')
@@ -0,0 +1,48 @@
+"""Add denormalized student_count to lesson
+
+Revision ID: f2a8c5d7e631
+Revises: c41f7e93a2d8
+Create Date: 2026-10-18 16:22:41.308517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8c5d7e631'
+down_revision = 'c41f7e93a2d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    # Fresh databases get the column from db.create_all()
+    if 'lesson' not in inspector.get_table_names():
+        return
+    if 'student_count' in {column['name'] for column in inspector.get_columns('lesson')}:
+        return
+
+    with op.batch_alter_table('lesson') as batch_op:
+        batch_op.add_column(sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_lesson_student_count_datetime', ['student_count', 'datetime'])
+
+    # Backfill from the lesson_student links
+    op.execute("""
+        UPDATE lesson SET student_count = (
+            SELECT count(*) FROM lesson_student ls WHERE ls.lesson_id = lesson.id
+        )
+    """)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'lesson' not in inspector.get_table_names():
+        return
+    if 'student_count' not in {column['name'] for column in inspector.get_columns('lesson')}:
+        return
+
+    with op.batch_alter_table('lesson') as batch_op:
+        batch_op.drop_index('ix_lesson_student_count_datetime')
+        batch_op.drop_column('student_count')
@@ -0,0 +1,29 @@
+import pytest
+from app.db import db
+from app.main import create_app
+from app.models import User
+
+
+@pytest.fixture
+def app():
+    """A fresh 'testing' app with an empty in-memory database and one admin user."""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(first_name='Test', last_name='Admin', email='admin@example.com', role='admin')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as the admin user, sending the CSRF token with every request."""
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': 'admin@example.com', 'password': 'password'})
+    assert response.status_code == 200
+    client.environ_base['HTTP_X_CSRF_TOKEN'] = client.get_cookie('csrf_access_token').value
+    return client
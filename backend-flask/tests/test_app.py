@@ -0,0 +1,24 @@
+import sys
+from app.main import create_app
+
+
+def test_create_app_builds_independent_apps():
+    first, second = create_app('testing'), create_app('testing')
+    assert first is not second
+    for app in (first, second):
+        assert app.testing
+        assert app.test_client().get('/').data == b'Hello, World!'
+        assert 'metrics' not in app.view_functions
+
+
+def test_api_route_requires_login(client, app):
+    assert app.test_client().get('/api/students').status_code == 401
+    response = client.get('/api/students')
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'success', 'data': {'students': []}}
+
+
+def test_optional_subsystems_load_only_when_enabled():
+    # Neither test app enables metrics, so prometheus_client is never imported
+    create_app('testing')
+    assert 'prometheus_client' not in sys.modules
@@ -0,0 +1,171 @@
+from datetime import datetime
+import pytest
+from app.data.synthetic_data import generate_synthetic_data
+from app.db import db
+from app.models import Curriculum, Lesson, Level, Student, StudentLessonQuiz, StudentLevelHistory, StudentStatus, StudentStatusHistory
+from app.routes.utils import _query_stamps
+from app.schemas.schemas import (
+    CurriculumSchema, LessonSchema, LevelSchema, StudentLessonQuizSchema, StudentLevelHistorySchema,
+    StudentSchema, StudentStatusHistorySchema, StudentStatusSchema,
+)
+
+
+@pytest.fixture
+def school(app):
+    generate_synthetic_data(students=25, years=1, seed=3)
+    db.session.expunge_all()
+
+
+def python_stamps(query, schema):
+    # What an unconditional GET records from the rows it loads and dumps (see BaseSchema.dump_response)
+    db.session.expunge_all()
+    return schema.row_stamps(query.options(*schema.eager_load_options()).all())
+
+
+SCHEMAS = [
+    (LessonSchema.cached(many=True), lambda: Lesson.query.filter(Lesson.student_count > 1)),
+    (LessonSchema.cached(many=True, only=('id', 'datetime', 'students.first_name')), lambda: Lesson.query),
+    (StudentSchema.cached(many=True), lambda: Student.query),
+    (StudentSchema.cached(many=True), lambda: Student.query.filter(Student.id.in_([3, 5, 8]))),
+    (StudentStatusHistorySchema.cached(many=True), lambda: StudentStatusHistory.query),
+    (StudentLevelHistorySchema.cached(many=True), lambda: StudentLevelHistory.query),
+    (StudentLessonQuizSchema.cached(many=True), lambda: StudentLessonQuiz.query),
+    (StudentStatusSchema.cached(many=True), lambda: StudentStatus.query),
+    (LevelSchema.cached(many=True), lambda: Level.query),
+    (CurriculumSchema.cached(many=True), lambda: Curriculum.query),
+]
+
+
+@pytest.mark.parametrize('schema, query', SCHEMAS)
+def test_python_and_sql_stamps_agree(school, schema, query):
+    assert schema.version_nodes() is not None
+    stamps = _query_stamps(query(), schema)
+    assert stamps == python_stamps(query(), schema)
+    # Every version node is covered, nested relationships included
+    assert len(stamps) == len(schema.version_nodes())
+    assert all(count for count, _, _, _ in stamps)
+
+
+@pytest.mark.parametrize('schema, query', SCHEMAS[:4])
+def test_python_and_sql_stamps_agree_for_a_page(school, schema, query):
+    model = schema.opts.model
+    page = query().order_by(model.updated_date.desc(), model.id.desc()).limit(4).offset(3)
+    assert _query_stamps(page, schema, paged=True) == python_stamps(page, schema)
+
+
+def test_stamps_change_with_nested_rows(school):
+    schema = StudentSchema.cached(many=True)
+    query = Student.query.filter(Student.id == 4)
+    before = _query_stamps(query, schema)
+
+    # Moving a lesson link between students changes the pair stamps, not just the counts
+    lesson = Lesson.query.filter(Lesson.students.any(Student.id == 4)).first()
+    student = db.session.get(Student, 4)
+    lesson.students.remove(student)
+    lesson.students.append(db.session.get(Student, 5))
+    db.session.commit()
+    after = _query_stamps(query, schema)
+    assert after != before
+    assert after == python_stamps(query, schema)
+
+
+def revalidate(client, url):
+    """A plain GET, then the same GET with its ETag; returns both responses."""
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    etag = response.headers['ETag']
+    return response, client.get(url, headers={'If-None-Match': etag})
+
+
+@pytest.mark.parametrize('url', [
+    '/api/lessons',
+    '/api/lessons?do_paginate=true&page=2&per_page=5',
+    '/api/lessons?cursor=&per_page=5&with_total=true',
+    '/api/students',
+    '/api/students?do_paginate=true&page=3&per_page=4',
+    '/api/students?cursor=&per_page=4',
+    '/api/students/3',
+    '/api/student-status-history?cursor=&per_page=6',
+    '/api/student-level-history?do_paginate=true&page=2&per_page=6',
+    '/api/student-lesson-quizzes?cursor=&per_page=10',
+    '/api/lesson-students?do_paginate=true&page=4&per_page=10',
+    '/api/student-statuses',
+    '/api/student-statuses/1',
+    '/api/students/3/overview',
+    '/api/lessons/calendar',
+])
+def test_revalidation_is_not_modified(client, school, url):
+    response, revalidated = revalidate(client, url)
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == response.headers['ETag']
+
+
+def test_next_cursor_page_revalidates(client, school):
+    first = client.get('/api/lessons?cursor=&per_page=5').get_json()['data']
+    url = f"/api/lessons?cursor={first['pagination']['next_cursor']}&per_page=5"
+    _, revalidated = revalidate(client, url)
+    assert revalidated.status_code == 304
+
+
+def test_page_validators_cover_only_the_page(client, school):
+    url = '/api/students?cursor=&per_page=4'
+    response = client.get(url)
+    etag = response.headers['ETag']
+    page_ids = [student['id'] for student in response.get_json()['data']['students']]
+
+    # Editing a student on a later page leaves this page current
+    later = Student.query.filter(Student.id.notin_(page_ids)).order_by(Student.id.desc()).first()
+    later.notes_general = 'Changed elsewhere'
+    db.session.commit()
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    # Editing one on the page does not
+    db.session.get(Student, page_ids[-1]).notes_general = 'Changed here'
+    db.session.commit()
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_page_validators_cover_the_total(client, school):
+    url = '/api/students?do_paginate=true&page=1&per_page=4'
+    etag = client.get(url).headers['ETag']
+    # A new student lands on a later page but changes the total and page count
+    db.session.add(Student(first_name='New'))
+    db.session.commit()
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['pagination']['total'] == 26
+
+
+def test_student_status_changes_are_modified(client, school):
+    url = '/api/student-statuses'
+    etag = client.get(url).headers['ETag']
+    status = StudentStatus.query.first()
+    before = status.updated_date
+    status.name = 'Renamed'
+    db.session.commit()
+    assert status.updated_date > before
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_overview_changes_are_modified(client, school):
+    url = '/api/students/3/overview'
+    etag = client.get(url).headers['ETag']
+    history = StudentStatusHistory.query.filter_by(student_id=3).first()
+    history.changed_at = datetime(2020, 1, 1)
+    db.session.commit()
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_streams_and_writes_carry_no_validators(client, school):
+    assert 'ETag' not in client.get('/api/lessons?format=ndjson').headers
+    response = client.post('/api/students', json={'student': {'first_name': 'New'}})
+    assert response.status_code == 201
+    assert 'ETag' not in response.headers
@@ -0,0 +1,146 @@
+from datetime import datetime
+import pytest
+from app.db import db
+from app.models import Lesson, LessonStudent, Student
+
+
+@pytest.fixture
+def lessons(app):
+    students = [Student(first_name='Ana'), Student(first_name='Ben')]
+    lessons = [
+        Lesson(datetime=datetime(2024, 5, 6, 10), plan='Reading', students=[students[0]], student_count=1),
+        Lesson(datetime=datetime(2024, 5, 7, 10), plan='Writing', students=students, student_count=2),
+    ]
+    db.session.add_all([*students, *lessons])
+    db.session.commit()
+    return {'lessons': [lesson.id for lesson in lessons], 'students': [student.id for student in students]}
+
+
+def snapshot():
+    """Every lesson's editable columns and every lesson-student link, to check that nothing changed."""
+    db.session.expire_all()
+    return (
+        sorted((lesson.id, lesson.datetime, lesson.plan, lesson.student_count) for lesson in Lesson.query),
+        sorted((link.lesson_id, link.student_id) for link in LessonStudent.query),
+    )
+
+
+def assert_rejected(response, status_code, results):
+    assert response.status_code == status_code
+    body = response.get_json()
+    assert body['status'] == 'error'
+    assert body['data']['results'] == results
+
+
+def test_bulk_create(client, lessons):
+    ana, ben = lessons['students']
+    response = client.post('/api/lessons/bulk', json={'lessons': [
+        {'lesson': {'datetime': '2024-05-08T10:00:00', 'plan': 'Speaking'}, 'student_ids': [ana, ben, ana]},
+        {'lesson': {'datetime': '2024-05-09T10:00:00'}},
+    ]})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['status'] == 'success'
+    results = body['data']['results']
+    assert [result['status'] for result in results] == ['created', 'created']
+    created = db.session.get(Lesson, results[0]['lesson']['id'])
+    assert created.student_count == 2
+    assert sorted(student.id for student in created.students) == [ana, ben]
+
+
+def test_bulk_create_is_all_or_nothing(client, lessons):
+    before = snapshot()
+    response = client.post('/api/lessons/bulk', json={'lessons': [
+        {'lesson': {'datetime': '2024-05-08T10:00:00'}, 'student_ids': [lessons['students'][0]]},
+        {'lesson': {'plan': 'No datetime'}},
+        {'lesson': {'datetime': '2024-05-09T10:00:00'}, 'student_ids': [999]},
+    ]})
+    assert_rejected(response, 400, [
+        {'index': 0, 'status': 'ok'},
+        {'index': 1, 'status': 'error', 'errors': {'datetime': ['Missing data for required field.']}},
+        {'index': 2, 'status': 'error', 'errors': {'student_ids': ['Unknown student ids: [999]']}},
+    ])
+    assert snapshot() == before
+
+
+def test_bulk_update_is_all_or_nothing(client, lessons):
+    first, second = lessons['lessons']
+    ana, ben = lessons['students']
+    before = snapshot()
+    response = client.put('/api/lessons/bulk', json={'lessons': [
+        {'id': first, 'lesson': {'plan': 'Changed'}, 'student_ids': [ana, ben]},
+        {'id': second, 'lesson': {'datetime': 'not a date'}},
+        {'id': 999, 'lesson': {'plan': 'Missing'}},
+    ]})
+    assert response.status_code == 400
+    results = response.get_json()['data']['results']
+    assert [result['status'] for result in results] == ['ok', 'error', 'error']
+    assert results[2]['errors'] == {'id': ['Lesson not found.']}
+    assert snapshot() == before
+
+
+def test_bulk_update_rejects_duplicate_ids(client, lessons):
+    first, second = lessons['lessons']
+    before = snapshot()
+    response = client.put('/api/lessons/bulk', json={'lessons': [
+        {'id': first, 'lesson': {'plan': 'Once'}},
+        {'id': second, 'lesson': {'plan': 'Other'}},
+        {'id': first, 'lesson': {'plan': 'Twice'}},
+    ]})
+    assert_rejected(response, 400, [
+        {'index': 0, 'status': 'ok'},
+        {'index': 1, 'status': 'ok'},
+        {'index': 2, 'status': 'error', 'errors': {'id': ['Duplicate id.']}},
+    ])
+    assert snapshot() == before
+
+
+def test_bulk_update(client, lessons):
+    first, second = lessons['lessons']
+    ana, ben = lessons['students']
+    response = client.put('/api/lessons/bulk', json={'lessons': [
+        {'id': first, 'lesson': {'plan': 'Changed'}, 'student_ids': [ana, ben]},
+        {'id': second, 'student_ids': [ben]},
+    ]})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Lesson, first).plan == 'Changed'
+    assert [lesson.student_count for lesson in Lesson.query.order_by(Lesson.id)] == [2, 1]
+
+
+def test_bulk_delete_rejects_duplicate_ids(client, lessons):
+    first, second = lessons['lessons']
+    before = snapshot()
+    response = client.delete('/api/lessons/bulk', json={'ids': [first, second, first]})
+    assert_rejected(response, 400, [
+        {'id': first, 'status': 'ok'},
+        {'id': second, 'status': 'ok'},
+        {'id': first, 'status': 'duplicate'},
+    ])
+    assert snapshot() == before
+
+
+def test_bulk_delete_is_all_or_nothing(client, lessons):
+    first, _ = lessons['lessons']
+    before = snapshot()
+    response = client.delete('/api/lessons/bulk', json={'ids': [first, 999]})
+    assert_rejected(response, 404, [{'id': first, 'status': 'ok'}, {'id': 999, 'status': 'not_found'}])
+    assert snapshot() == before
+
+
+def test_bulk_delete(client, lessons):
+    response = client.delete('/api/lessons/bulk', json={'ids': lessons['lessons']})
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+    assert snapshot() == ([], [])
+
+
+def test_bulk_body_errors_are_error_envelopes(client):
+    for method in (client.post, client.put):
+        response = method('/api/lessons/bulk', json={'lessons': 'nope'})
+        assert response.status_code == 400
+        assert response.get_json() == {
+            'status': 'error', 'message': "A list of lesson objects is required in 'lessons' key",
+        }
+    response = client.delete('/api/lessons/bulk', json={'ids': ['1']})
+    assert response.get_json()['status'] == 'error'
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+import pytest
+from app.db import db
+from app.models import Lesson, Student
+from app.routes.utils import decode_cursor, encode_cursor
+
+
+def make_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+@pytest.fixture
+def tied_lessons(app):
+    # Three datetimes shared by several lessons, so pages split ties on the datetime sort key
+    times = [datetime(2024, 5, 6, 10), datetime(2024, 5, 6, 12), datetime(2024, 5, 7, 9)]
+    lessons = [Lesson(datetime=times[i % 3]) for i in range(11)]
+    db.session.add_all(lessons)
+    db.session.commit()
+    return sorted(((lesson.datetime, lesson.id) for lesson in lessons), reverse=True)
+
+
+def fetch_all_pages(client, url, key, per_page):
+    ids, cursor = [], ''
+    while True:
+        response = client.get(f"{url}?cursor={cursor}&per_page={per_page}&with_total=true")
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        ids.extend(row['id'] for row in data[key])
+        cursor = data['pagination']['next_cursor']
+        if cursor is None:
+            return ids, data['pagination']['total']
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 4, 11, 20])
+def test_lesson_cursor_pages_return_each_row_once(client, tied_lessons, per_page):
+    ids, total = fetch_all_pages(client, '/api/lessons', 'lessons', per_page)
+    assert ids == [lesson_id for _, lesson_id in tied_lessons]
+    assert total == len(tied_lessons)
+
+
+def test_student_cursor_pages_are_ascending(client, app):
+    db.session.add_all([Student(first_name=f"Student {i}") for i in range(7)])
+    db.session.commit()
+    ids, total = fetch_all_pages(client, '/api/students', 'students', 3)
+    assert ids == sorted(student.id for student in Student.query)
+    assert total == 7
+
+
+def test_cursor_round_trip():
+    columns = [Lesson.datetime, Lesson.id]
+    values = [datetime(2024, 5, 6, 10, 30), 42]
+    assert decode_cursor(encode_cursor(values), columns) == values
+
+
+@pytest.mark.parametrize('cursor', [
+    '!!not-base64!!',
+    base64.urlsafe_b64encode(b'not json').decode(),
+    make_cursor({'id': 1}),
+    make_cursor(['2024-05-06T10:00:00']),
+    make_cursor(['2024-05-06T10:00:00', 1, 2]),
+    make_cursor(['2024-05-06T10:00:00', '1']),
+    make_cursor(['2024-05-06T10:00:00', 1.5]),
+    make_cursor(['2024-05-06T10:00:00', True]),
+    make_cursor(['yesterday', 1]),
+    make_cursor([20240506, 1]),
+    make_cursor([None, 1]),
+])
+def test_malformed_cursor_is_rejected(client, tied_lessons, cursor):
+    response = client.get(f'/api/lessons?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "Invalid cursor."
+
+
+@pytest.mark.parametrize('cursor', [make_cursor(['1']), make_cursor([None]), make_cursor([1, 2])])
+def test_malformed_student_cursor_is_rejected(client, cursor):
+    assert client.get(f'/api/students?cursor={cursor}').status_code == 400
@@ -0,0 +1,110 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import func
+from app.db import db
+from app.models import Lesson, LessonStudent, Student
+
+
+@pytest.fixture
+def week(app):
+    students = [Student(first_name=name) for name in ('Ana', 'Ben', 'Cai')]
+    lessons = [
+        Lesson(datetime=datetime(2024, 5, 6, 10), students=students[:2], student_count=2),
+        Lesson(datetime=datetime(2024, 5, 7, 10), students=[students[2]], student_count=1),
+        Lesson(datetime=datetime(2024, 5, 8, 10)),
+    ]
+    db.session.add_all([*students, *lessons])
+    db.session.commit()
+    return {'students': [student.id for student in students], 'lessons': [lesson.id for lesson in lessons]}
+
+
+def assert_student_counts():
+    """Every lesson's student_count equals its number of lesson-student links."""
+    db.session.expire_all()
+    links = dict(db.session.query(LessonStudent.lesson_id, func.count()).group_by(LessonStudent.lesson_id).all())
+    lessons = Lesson.query.all()
+    assert lessons
+    for lesson in lessons:
+        assert lesson.student_count == links.get(lesson.id, 0) == len(lesson.students), lesson.id
+
+
+def test_lesson_create_and_update(client, week):
+    ana, ben, cai = week['students']
+    response = client.post('/api/lessons', json={'lesson': {'datetime': '2024-05-09T10:00:00'}, 'student_ids': [ana, ben, cai]})
+    assert response.status_code == 201
+    assert response.get_json()['data']['student_count'] == 3
+    assert_student_counts()
+
+    response = client.put(f"/api/lessons/{week['lessons'][0]}", json={'lesson': {}, 'student_ids': [cai]})
+    assert response.status_code == 200
+    assert_student_counts()
+
+
+def test_lesson_student_links(client, week):
+    first, second, third = week['lessons']
+    ana, _, cai = week['students']
+    response = client.post('/api/lesson-students', json={'lesson_student': {'lesson_id': third, 'student_id': ana}})
+    assert response.status_code == 201
+    link_id = response.get_json()['data']['id']
+    assert_student_counts()
+
+    # A duplicate link is rejected and counts nothing
+    response = client.post('/api/lesson-students', json={'lesson_student': {'lesson_id': third, 'student_id': ana}})
+    assert response.status_code == 409
+    assert_student_counts()
+
+    # Moving a link to another lesson adjusts both lessons
+    response = client.put(f'/api/lesson-students/{link_id}', json={'lesson_student': {'lesson_id': second}})
+    assert response.status_code == 200
+    assert_student_counts()
+    assert db.session.get(Lesson, third).student_count == 0
+
+    # Cai is already in the second lesson
+    response = client.put(f'/api/lesson-students/{link_id}', json={'lesson_student': {'student_id': cai}})
+    assert response.status_code == 409
+    assert_student_counts()
+
+    # Changing only the student keeps the count
+    link = LessonStudent.query.filter_by(lesson_id=first).first()
+    response = client.put(f'/api/lesson-students/{link.id}', json={'lesson_student': {'student_id': cai}})
+    assert response.status_code == 200
+    assert_student_counts()
+
+    assert client.delete(f'/api/lesson-students/{link_id}').status_code == 204
+    assert_student_counts()
+
+
+def test_bulk_lessons(client, week):
+    ana, ben, cai = week['students']
+    first, second, _ = week['lessons']
+    response = client.post('/api/lessons/bulk', json={'lessons': [
+        {'lesson': {'datetime': '2024-05-10T10:00:00'}, 'student_ids': [ana, ben]},
+        {'lesson': {'datetime': '2024-05-10T12:00:00'}},
+    ]})
+    assert response.status_code == 201
+    assert_student_counts()
+
+    response = client.put('/api/lessons/bulk', json={'lessons': [
+        {'id': first, 'student_ids': [cai]},
+        {'id': second, 'student_ids': [ana, ben, cai]},
+    ]})
+    assert response.status_code == 200
+    assert_student_counts()
+
+
+def test_copy_week(client, week):
+    response = client.post('/api/lessons/copy-week', json={'source_start': '2024-05-06', 'target_start': '2024-05-13'})
+    assert response.status_code == 201
+    assert response.get_json()['data']['students_copied'] == 3
+    assert_student_counts()
+    copies = Lesson.query.filter(Lesson.datetime >= datetime(2024, 5, 13)).order_by(Lesson.datetime).all()
+    assert [lesson.student_count for lesson in copies] == [2, 1, 0]
+
+
+def test_student_delete(client, week):
+    ana, _, cai = week['students']
+    assert client.delete(f'/api/students/{ana}').status_code == 204
+    assert_student_counts()
+    assert client.delete(f'/api/students/{cai}').status_code == 204
+    assert_student_counts()
+    assert [lesson.student_count for lesson in Lesson.query.order_by(Lesson.id)] == [1, 0, 0]
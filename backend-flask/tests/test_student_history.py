@@ -0,0 +1,149 @@
+from datetime import datetime
+import pytest
+from app.db import db
+from app.models import Curriculum, Level, Student, StudentLevelHistory, StudentStatus, StudentStatusHistory
+
+
+@pytest.fixture
+def school(app):
+    students = [Student(first_name='Ana'), Student(first_name='Ben')]
+    statuses = [StudentStatus(name='Active'), StudentStatus(name='Paused'), StudentStatus(name='Left')]
+    curriculum = Curriculum(name='General')
+    levels = [Level(name=f"Level {i}", curriculum=curriculum) for i in range(1, 4)]
+    db.session.add_all([*students, *statuses, curriculum, *levels])
+    db.session.commit()
+    return {
+        'students': [student.id for student in students],
+        'statuses': [status.id for status in statuses],
+        'levels': [level.id for level in levels],
+    }
+
+
+def current_status(student_id):
+    db.session.expire_all()
+    student = db.session.get(Student, student_id)
+    return student.current_status_id, student.current_status_changed_at
+
+
+def current_level(student_id):
+    db.session.expire_all()
+    student = db.session.get(Student, student_id)
+    return student.current_level_id, student.current_level_start_date
+
+
+def add_status(client, student_id, status_id, changed_at):
+    response = client.post('/api/student-status-history', json={'student_status_history': {
+        'student_id': student_id, 'status_id': status_id, 'changed_at': changed_at.isoformat(),
+    }})
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+
+def add_level(client, student_id, level_id, start_date):
+    response = client.post('/api/student-level-history', json={'student_level_history': {
+        'student_id': student_id, 'level_id': level_id, 'start_date': start_date.isoformat(),
+    }})
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+
+def test_status_history_changes_keep_current_status(client, school):
+    ana, ben = school['students']
+    active, paused, left = school['statuses']
+    assert current_status(ana) == (None, None)
+
+    first = add_status(client, ana, active, datetime(2024, 1, 1))
+    assert current_status(ana) == (active, datetime(2024, 1, 1))
+    # An older record does not replace the latest one
+    older = add_status(client, ana, paused, datetime(2023, 6, 1))
+    assert current_status(ana) == (active, datetime(2024, 1, 1))
+    latest = add_status(client, ana, left, datetime(2024, 3, 1))
+    assert current_status(ana) == (left, datetime(2024, 3, 1))
+
+    # Moving a record's date makes it the latest
+    response = client.put(f'/api/student-status-history/{older}', json={'student_status_history': {
+        'changed_at': '2024-06-01T00:00:00',
+    }})
+    assert response.status_code == 200
+    assert current_status(ana) == (paused, datetime(2024, 6, 1))
+
+    # Moving it to another student updates both students
+    response = client.put(f'/api/student-status-history/{older}', json={'student_status_history': {'student_id': ben}})
+    assert response.status_code == 200
+    assert current_status(ana) == (left, datetime(2024, 3, 1))
+    assert current_status(ben) == (paused, datetime(2024, 6, 1))
+
+    assert client.delete(f'/api/student-status-history/{latest}').status_code == 204
+    assert current_status(ana) == (active, datetime(2024, 1, 1))
+    assert client.delete(f'/api/student-status-history/{first}').status_code == 204
+    assert current_status(ana) == (None, None)
+    assert current_status(ben) == (paused, datetime(2024, 6, 1))
+
+
+def test_level_history_changes_keep_current_level(client, school):
+    ana, ben = school['students']
+    one, two, three = school['levels']
+
+    first = add_level(client, ana, one, datetime(2024, 1, 1))
+    second = add_level(client, ana, two, datetime(2024, 4, 1))
+    assert current_level(ana) == (two, datetime(2024, 4, 1))
+    # Same start date: the later record wins
+    third = add_level(client, ana, three, datetime(2024, 4, 1))
+    assert current_level(ana) == (three, datetime(2024, 4, 1))
+
+    response = client.put(f'/api/student-level-history/{first}', json={'student_level_history': {
+        'start_date': '2024-09-01T00:00:00',
+    }})
+    assert response.status_code == 200
+    assert current_level(ana) == (one, datetime(2024, 9, 1))
+
+    response = client.put(f'/api/student-level-history/{third}', json={'student_level_history': {'student_id': ben}})
+    assert response.status_code == 200
+    assert current_level(ana) == (one, datetime(2024, 9, 1))
+    assert current_level(ben) == (three, datetime(2024, 4, 1))
+
+    assert client.delete(f'/api/student-level-history/{first}').status_code == 204
+    assert current_level(ana) == (two, datetime(2024, 4, 1))
+    assert client.delete(f'/api/student-level-history/{second}').status_code == 204
+    assert current_level(ana) == (None, None)
+
+
+def test_deleting_a_level_falls_back_to_the_previous_one(client, school):
+    ana, ben = school['students']
+    one, two, _ = school['levels']
+    add_level(client, ana, one, datetime(2024, 1, 1))
+    add_level(client, ana, two, datetime(2024, 4, 1))
+    add_level(client, ben, two, datetime(2024, 2, 1))
+
+    assert client.delete(f'/api/levels/{two}').status_code == 204
+    assert current_level(ana) == (one, datetime(2024, 1, 1))
+    assert current_level(ben) == (None, None)
+    assert StudentLevelHistory.query.count() == 1
+
+
+def test_invalid_history_changes_leave_current_status_alone(client, school):
+    ana, _ = school['students']
+    active, _, _ = school['statuses']
+    record = add_status(client, ana, active, datetime(2024, 1, 1))
+
+    response = client.put(f'/api/student-status-history/{record}', json={'student_status_history': {'student_id': 999}})
+    assert response.status_code == 404
+    assert current_status(ana) == (active, datetime(2024, 1, 1))
+    assert StudentStatusHistory.query.count() == 1
+
+
+def test_overview_histories_include_their_status_and_level(client, school):
+    ana = school['students'][0]
+    add_status(client, ana, school['statuses'][1], datetime(2024, 2, 1))
+    add_level(client, ana, school['levels'][2], datetime(2024, 3, 1))
+
+    overview = client.get(f"/api/students/{ana}/overview").get_json()['data']
+    [status_entry] = overview['status_history']
+    assert status_entry['status'] == {
+        'id': school['statuses'][1], 'name': 'Paused', 'updated_date': status_entry['status']['updated_date'],
+    }
+    [level_entry] = overview['level_history']
+    assert level_entry['level']['id'] == school['levels'][2]
+    assert level_entry['level']['name'] == 'Level 3'
+    assert level_entry['level']['curriculum']['name'] == 'General'
+    assert 'student' not in status_entry and 'student' not in level_entry
@@ -1,4 +1,4 @@
-import type { Lesson, Pagination } from "../types";
+import type { Lesson, Pagination, Student } from "../types";
 import { apiRequest } from "./apiClient";
 import type { QueryParams } from "./apiClient";
 
@@ -10,6 +10,47 @@ export interface LessonsResponse {
     pagination?: Pagination;
 }
 
+export interface BulkLessonResult {
+    index: number;
+    status: 'created' | 'updated';
+    lesson: Lesson;
+}
+
+export interface BulkLessonsResponse {
+    results: BulkLessonResult[];
+}
+
+export interface CopyWeekResponse {
+    lessons_copied: number;
+    students_copied: number;
+    target_start: string;
+    target_end: string;
+}
+
+export interface CalendarTotals {
+    lessons: number;
+    group_lessons: number;
+    individual_lessons: number;
+    students: number;
+}
+
+export interface CalendarLesson extends Pick<Lesson, 'id' | 'datetime' | 'plan' | 'student_count'> {
+    students: Pick<Student, 'id' | 'first_name' | 'last_name'>[];
+}
+
+export interface CalendarDay {
+    date: string;
+    totals: CalendarTotals;
+    hours: { hour: number; lessons: CalendarLesson[] }[];
+}
+
+export interface LessonCalendarResponse {
+    start: string;
+    end: string;
+    totals: CalendarTotals;
+    days: CalendarDay[];
+}
+
 function extractLessonFields(lesson: Lesson): LessonUpdateFields {
     const { datetime, plan, concepts, notes } = lesson;
     return { datetime, plan, concepts, notes };
@@ -19,6 +60,10 @@ export async function fetchLessons(params: QueryParams = {}): Promise<LessonsRes
     return await apiRequest<LessonsResponse>('/lessons', 'GET', null, {}, params);
 }
 
+export async function fetchLessonCalendar(params: QueryParams = {}): Promise<LessonCalendarResponse> {
+    return await apiRequest<LessonCalendarResponse>('/lessons/calendar', 'GET', null, {}, params);
+}
+
 export async function fetchLesson(id: number): Promise<Lesson> {
     return await apiRequest<Lesson>(`/lessons/${id}`, 'GET');
 }
@@ -45,4 +90,40 @@ export async function updateLesson(id: number, lesson: Partial<LessonUpdateField
 
 export async function deleteLesson(id: number): Promise<void> {
     await apiRequest<void>(`/lessons/${id}`, 'DELETE');
-}
\ No newline at end of file
+}
+
+export async function createLessons(lessons: { lesson: LessonCreateFields | Lesson, student_ids?: number[] }[]): Promise<Lesson[]> {
+    const payload = {
+        lessons: lessons.map(({ lesson, student_ids = [] }) => ({
+            lesson: 'id' in lesson ? extractLessonFields(lesson) : lesson,
+            student_ids
+        }))
+    };
+    const response = await apiRequest<BulkLessonsResponse>('/lessons/bulk', 'POST', payload);
+    return response.results.map(result => result.lesson);
+}
+
+export async function updateLessons(lessons: { id: number, lesson: Partial<LessonUpdateFields> | Lesson, student_ids?: number[] }[]): Promise<Lesson[]> {
+    const payload = {
+        lessons: lessons.map(({ id, lesson, student_ids = [] }) => ({
+            id,
+            lesson: 'id' in lesson ? extractLessonFields(lesson) : lesson,
+            student_ids
+        }))
+    };
+    const response = await apiRequest<BulkLessonsResponse>('/lessons/bulk', 'PUT', payload);
+    return response.results.map(result => result.lesson);
+}
+
+export async function deleteLessons(ids: number[]): Promise<void> {
+    await apiRequest<void>('/lessons/bulk', 'DELETE', { ids });
+}
+
+export async function copyWeek(source_start: string, target_start: string, include_students: boolean = true): Promise<CopyWeekResponse> {
+    const payload = {
+        source_start,
+        target_start,
+        include_students
+    };
+    return await apiRequest<CopyWeekResponse>('/lessons/copy-week', 'POST', payload);
+}
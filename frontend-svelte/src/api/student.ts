@@ -1,4 +1,4 @@
-import type { Student, Pagination } from "../types";
+import type { Student, Pagination, Lesson, StudentStatusHistory, StudentLevelHistory, StudentLessonQuiz } from "../types";
 import type { QueryParams } from "./apiClient";
 import { apiRequest } from "./apiClient";
 
@@ -10,6 +10,32 @@ export interface StudentsResponse {
     pagination?: Pagination;
 }
 
+export interface StudentOverview {
+    student: Omit<Student, 'lessons' | 'status_history' | 'level_history' | 'quizzes'>;
+    status_history: StudentStatusHistory[];
+    level_history: StudentLevelHistory[];
+    recent_lessons: Omit<Lesson, 'students'>[];
+    upcoming_lessons: Omit<Lesson, 'students'>[];
+    quizzes: StudentLessonQuiz[];
+    lesson_count: number;
+    quiz_count: number;
+}
+
+/**
+ * Builds a Student from an overview, so the student card can keep using the student helpers.
+ * The overview leaves each lesson's students out; these lessons are all this student's own.
+ */
+export function studentFromOverview(overview: StudentOverview): Student {
+    const lessons = [...overview.recent_lessons, ...overview.upcoming_lessons];
+    return {
+        ...overview.student,
+        status_history: overview.status_history,
+        level_history: overview.level_history,
+        lessons: lessons.map(lesson => ({ ...lesson, students: [] })),
+        quizzes: overview.quizzes
+    };
+}
+
 function extractStudentFields(student: Student): StudentUpdateFields {
     const { first_name, last_name, date_started, classes_per_week, notes_general, notes_strengths, notes_weaknesses, notes_future } = student;
     return { first_name, last_name, date_started, classes_per_week, notes_general, notes_strengths, notes_weaknesses, notes_future };
@@ -23,6 +49,10 @@ export async function fetchStudent(id: number): Promise<Student> {
     return await apiRequest<Student>(`/students/${id}`, 'GET');
 }
 
+export async function fetchStudentOverview(id: number, params: QueryParams = {}): Promise<StudentOverview> {
+    return await apiRequest<StudentOverview>(`/students/${id}/overview`, 'GET', null, {}, params);
+}
+
 export async function createStudent(student: StudentCreateFields): Promise<Student> {
     const payload = {
         student
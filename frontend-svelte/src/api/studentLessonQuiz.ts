@@ -1,4 +1,4 @@
-import type { StudentLessonQuiz, Pagination } from '../types/index';
+import type { StudentLessonQuiz, Pagination, Quiz, Student } from '../types/index';
 import { apiRequest } from './apiClient';
 import type { QueryParams } from './apiClient';
 
@@ -11,6 +11,24 @@ export interface StudentLessonQuizzesResponse {
     pagination?: Pagination;
 }
 
+export interface GradebookQuiz extends Pick<Quiz, 'id' | 'name' | 'max_points' | 'unit_id'> {
+    students: number;
+    attempts: number;
+    average_best: number | null;
+    average_latest: number | null;
+}
+
+// [best, latest, attempts]
+export type GradebookCell = [number | null, number | null, number];
+
+export interface GradebookResponse {
+    level_id: number | null;
+    unit_id: number | null;
+    quizzes: GradebookQuiz[];
+    students: Pick<Student, 'id' | 'first_name' | 'last_name'>[];
+    grades: (GradebookCell | null)[][];
+}
+
 function extractStudentLessonQuizFields(record: StudentLessonQuiz): StudentLessonQuizUpdateFields {
     const { student_id, lesson_id, quiz_id, points, notes } = record;
     return { student_id, lesson_id, quiz_id, points, notes };
@@ -43,3 +61,7 @@ export async function updateStudentLessonQuiz(id: number, record: Partial<Studen
 export async function deleteStudentLessonQuiz(id: number): Promise<void> {
     await apiRequest<void>(`/student-lesson-quizzes/${id}`, 'DELETE');
 }
+
+export async function fetchGradebook(params: { level_id: number } | { unit_id: number }): Promise<GradebookResponse> {
+    return await apiRequest<GradebookResponse>('/student-lesson-quizzes/gradebook', 'GET', null, {}, params);
+}
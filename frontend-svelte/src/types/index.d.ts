@@ -20,6 +20,7 @@ export interface Student {
 export interface StudentStatus {
   id: number;
   name: string;
+  updated_date: string;
 }
 
 export interface StudentStatusHistory {
@@ -29,6 +30,7 @@ export interface StudentStatusHistory {
   student_id: number;
   status_id: number;
   changed_at: string;
+  status?: StudentStatus;
 }
 
 export interface StudentLevelHistory {
@@ -38,6 +40,7 @@ export interface StudentLevelHistory {
   student_id: number;
   level_id: number;
   start_date: string;
+  level?: Level;
 }
 
 // Lessons
@@ -49,6 +52,7 @@ export interface Lesson {
   plan?: string;
   concepts?: string;
   notes?: string;
+  student_count: number;
   students: Student[];
 }
 
@@ -51,11 +51,12 @@ case $MODE in
     TIMESTAMP=$(date +"%Y-%m-%d_%H-%M-%S")
     BACKUP_FILE="backup-$TIMESTAMP.db"
     echo "Backing up database to ./db_backups/$BACKUP_FILE"
+    # The database runs in WAL mode, so copy it through SQLite to include committed pages not yet checkpointed
     docker run --rm \
       -v lesson-organizer_backend_db:/db \
       -v "$(pwd)/db_backups":/backup \
       alpine \
-      cp /db/lesson_organizer.db /backup/$BACKUP_FILE
+      sh -c "apk add --no-cache sqlite > /dev/null && sqlite3 /db/lesson_organizer.db '.backup /backup/$BACKUP_FILE'"
     echo "Backup complete."
     exit 0
     ;;